@@ -0,0 +1,225 @@
+"""Generate synthetic budget databases for benchmarking.
+
+    python -m benchmarks.generate bench.db --expenses 1000000 --goals 1000
+
+Rows are random but seeded, so the same arguments always produce the same
+ledger. Expenses are bulk-loaded with the expense indexes and the totals
+and search triggers dropped; the search index is rebuilt once, and init_db
+recreates the rest and backfills the totals in one pass, which is far faster
+than maintaining them row by row.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import database
+
+# Named sizes for the runner; anything else can be given explicitly.
+SIZES = {
+    "small": {"expenses": 10_000, "goals": 50, "subscriptions": 20},
+    "medium": {"expenses": 1_000_000, "goals": 1_000, "subscriptions": 500},
+    "large": {"expenses": 10_000_000, "goals": 5_000, "subscriptions": 2_000},
+}
+
+BATCH_SIZE = 50_000
+
+_CATEGORIES = ("Groceries", "Dining", "Transport", "Housing", "Utilities", "Health", "Fun", "Shopping")
+_MERCHANTS = ("COSTCO", "TRADER JOES", "SHELL", "UBER", "AMAZON", "TARGET", "CVS", "NETFLIX", "CHIPOTLE", "IKEA")
+_TAGS = (None, None, None, "food", "work", "travel", "gift", "food,bulk", "kids")
+_GOAL_TYPES = ("target_balance", "contribution_cap", "debt_payoff", "custom")
+_CADENCES = ("weekly", "biweekly", "monthly", "quarterly", "yearly")
+
+
+def _expense_rows(rng: random.Random, count: int, category_ids: list[int], start: date, days: int):
+    # Dates are generated in order so the ledger looks like real history.
+    for i in range(count):
+        day = start + timedelta(days=i * days // count)
+        amount = rng.randint(100, 20_000)
+        paid = amount if rng.random() < 0.8 else 0
+        yield (
+            day.isoformat(),
+            amount,
+            rng.choice(category_ids),
+            paid,
+            f"{rng.choice(_MERCHANTS)} #{rng.randint(1, 9999)}",
+            rng.choice(_TAGS),
+        )
+
+
+def _batched(rows, size: int = BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_ledger(
+    path: str | Path,
+    expenses: int = 10_000,
+    goals: int = 50,
+    subscriptions: int = 20,
+    accounts: int = 20,
+    debts: int = 10,
+    months: int = 24,
+    seed: int = 0,
+) -> Path:
+    """Create (or replace) a database at ``path`` filled with synthetic data."""
+    path = Path(path)
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+    rng = random.Random(seed)
+    today = date.today()
+    start = today - timedelta(days=months * 30)
+    days = (today - start).days + 1
+    created = start.isoformat()
+
+    database.close_all()
+    previous_path = database.DB_PATH
+    database.DB_PATH = path
+    try:
+        database.init_db()
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("DROP TRIGGER trg_expenses_totals_insert")
+            conn.execute("DROP TRIGGER IF EXISTS trg_expenses_fts_insert")
+            conn.execute("DROP INDEX idx_expenses_date")
+            conn.execute("DROP INDEX idx_expenses_category_date")
+
+            conn.executemany(
+                "INSERT INTO accounts(name, institution, type, balance, interest_rate, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (f"Account {i}", "Bank", rng.choice(("checking", "savings", "hysa")), rng.randint(10**6, 10**9), 4.0, created)
+                    for i in range(1, accounts + 1)
+                ],
+            )
+            conn.executemany(
+                """
+                INSERT INTO debts(name, institution, type, balance, interest_rate, min_payment, due_day, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (f"Debt {i}", "Lender", "loan", rng.randint(10**5, 10**7), rng.uniform(3, 25), rng.randint(2_500, 50_000), rng.randint(1, 28), created)
+                    for i in range(1, debts + 1)
+                ],
+            )
+
+            pct = 100.0 / len(_CATEGORIES)
+            category_ids = []
+            for name in _CATEGORIES:
+                parent_id = conn.execute(
+                    "INSERT INTO categories(name, parent_id, allocation_pct, created_at) VALUES (?, NULL, ?, ?)",
+                    (name, pct, created),
+                ).lastrowid
+                category_ids.append(parent_id)
+                for sub in ("A", "B"):
+                    category_ids.append(
+                        conn.execute(
+                            "INSERT INTO categories(name, parent_id, allocation_pct, created_at) VALUES (?, ?, 0, ?)",
+                            (f"{name} {sub}", parent_id, created),
+                        ).lastrowid
+                    )
+
+            conn.execute(
+                "INSERT INTO income_profile(id, expected_amount, cadence, updated_at) VALUES (1, ?, 'biweekly', ?)",
+                (250_000, created),
+            )
+            conn.executemany(
+                "INSERT INTO income_entries(date, amount, source, note) VALUES (?, ?, 'Payroll', NULL)",
+                [((start + timedelta(days=d)).isoformat(), 250_000) for d in range(0, days, 14)],
+            )
+            conn.executemany(
+                """
+                INSERT INTO recurring_expenses(name, amount, cadence, category_id, due_day, active, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (f"Subscription {i}", rng.randint(199, 20_000), rng.choice(_CADENCES), rng.choice(category_ids), rng.randint(1, 28), int(rng.random() < 0.9), created)
+                    for i in range(1, subscriptions + 1)
+                ],
+            )
+
+            goal_rows = []
+            for i in range(1, goals + 1):
+                goal_type = rng.choice(_GOAL_TYPES)
+                link_type = {"target_balance": "account", "debt_payoff": "debt"}.get(goal_type)
+                link_id = rng.randint(1, accounts if link_type == "account" else debts) if link_type else None
+                target_date = (today + timedelta(days=rng.randint(-30, 3 * 365))).isoformat() if rng.random() < 0.85 else None
+                goal_rows.append(
+                    (
+                        goal_type,
+                        f"Goal {i}",
+                        link_type,
+                        link_id,
+                        rng.randint(10**6, 10**7) if goal_type == "debt_payoff" else None,
+                        0 if goal_type == "debt_payoff" else rng.randint(10**5, 10**9),
+                        target_date,
+                        today.year if goal_type == "contribution_cap" else None,
+                        700_000 if goal_type == "contribution_cap" else None,
+                        rng.randint(0, 700_000) if goal_type == "contribution_cap" else None,
+                        rng.randint(0, 10**6) if goal_type == "custom" else None,
+                        created,
+                    )
+                )
+            conn.executemany(
+                """
+                INSERT INTO goals(
+                    type, name, link_type, link_id, start_amount, target_amount, target_date,
+                    year, contribution_limit, contributed_so_far, current_amount_override, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                goal_rows,
+            )
+
+            for batch in _batched(_expense_rows(rng, expenses, category_ids, start, days)):
+                conn.executemany(
+                    "INSERT INTO expenses(date, amount, category_id, paid_amount, note, tags) VALUES (?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'expenses_fts'").fetchone():
+                conn.execute("INSERT INTO expenses_fts(expenses_fts) VALUES ('rebuild')")
+            conn.commit()
+        finally:
+            conn.close()
+
+        # Recreates the dropped triggers and indexes and backfills the totals.
+        database.init_db()
+        database.sync_expense_tags(1)
+    finally:
+        database.close_all()
+        database.DB_PATH = previous_path
+    return path
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic budget database.")
+    parser.add_argument("path")
+    parser.add_argument("--size", choices=SIZES, default="small", help="preset row counts (default: small)")
+    parser.add_argument("--expenses", type=int, help="override the preset expense count")
+    parser.add_argument("--goals", type=int, help="override the preset goal count")
+    parser.add_argument("--subscriptions", type=int, help="override the preset subscription count")
+    parser.add_argument("--months", type=int, default=24, help="months of history (default: 24)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    counts = dict(SIZES[args.size])
+    for key in counts:
+        if getattr(args, key) is not None:
+            counts[key] = getattr(args, key)
+    generate_ledger(args.path, months=args.months, seed=args.seed, **counts)
+    print(f"Wrote {args.path}: " + ", ".join(f"{n:,} {key}" for key, n in counts.items()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
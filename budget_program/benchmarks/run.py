@@ -0,0 +1,247 @@
+"""Time the hot service paths and endpoints against a synthetic ledger.
+
+    python -m benchmarks.run --size medium --output results.json
+    python -m benchmarks.run --db bench.db --compare results.json
+
+Each case runs a few warmup iterations and then ``--iterations`` timed ones;
+results are latency percentiles in milliseconds. ``--output`` writes them as
+JSON (with the commit, Python and SQLite versions) and ``--compare`` prints
+the p50/p90 change against an earlier results file. Run once more with
+BUDGET_READ_REPLICA=1 to compare reads served from the in-memory replica.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+import database
+from benchmarks.generate import SIZES, generate_ledger
+
+# Setup replaces the whole configuration, so it runs on its own scratch file
+# with a payload of this many accounts/debts/goals/subscriptions.
+SETUP_PAYLOAD_ROWS = 50
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "iterations": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p90_ms": round(percentile(ordered, 90), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+    }
+
+
+def time_case(func: Callable[[], object], iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return summarize(samples)
+
+
+def _setup_payload(rows: int) -> dict:
+    return {
+        "accounts": [{"name": f"Account {i}", "type": "checking", "balance": 1000 + i} for i in range(rows)],
+        "debts": [
+            {"name": f"Debt {i}", "type": "loan", "balance": 500 + i, "interest_rate": 7.5, "min_payment": 25}
+            for i in range(rows)
+        ],
+        "categories": [["Needs", 50], ["Wants", 30], ["Savings", 20]],
+        "goals": [
+            {"type": "debt_payoff", "name": f"Goal {i}", "link_type": "debt", "link_index": i, "target_date": "2030-01-01"}
+            for i in range(rows)
+        ],
+        "subscriptions": [{"name": f"Sub {i}", "amount": 9.99, "cadence": "monthly"} for i in range(rows)],
+        "income": {"expected_amount": 2500, "cadence": "biweekly"},
+    }
+
+
+def build_cases(client) -> dict[str, Callable[[], object]]:
+    """Benchmark name -> zero-argument callable, run against database.DB_PATH."""
+    from services.allocations import allocate_from_account, list_recent_expenses, search_expenses
+    from services.budget import compute_budget_plan
+    from services.debts import simulate_payoff
+    from services.forecast import forecast_goals
+    from services.goals import get_goal_progress
+
+    account_id = database.fetchone("SELECT id FROM accounts ORDER BY balance DESC LIMIT 1")["id"]
+    pending_ids = [
+        int(r["id"])
+        for r in database.fetchall("SELECT id FROM expenses WHERE amount - paid_amount >= 100 ORDER BY id DESC LIMIT 1000")
+    ]
+
+    def allocate():
+        # A cent at a time, rotating through pending expenses, so every
+        # iteration is a real guarded write that never runs out of room.
+        target_id = pending_ids[allocate.calls % len(pending_ids)]
+        allocate.calls += 1
+        allocate_from_account(account_id, "expense", target_id, 0.01, note="benchmark")
+
+    allocate.calls = 0
+
+    def dashboard():
+        response = client.get("/api/dashboard")
+        assert response.status_code == 200, response.status_code
+
+    cases = {
+        "compute_budget_plan": compute_budget_plan,
+        "get_goal_progress": get_goal_progress,
+        "list_recent_expenses": lambda: list_recent_expenses(limit=50),
+        "search_expenses": lambda: search_expenses("costco", limit=50),
+        "api_dashboard": dashboard,
+    }
+    if pending_ids:
+        cases["allocate_from_account"] = allocate
+
+        def dashboard_after_write():
+            # With BUDGET_READ_REPLICA=1 this includes refreshing the copy.
+            allocate()
+            dashboard()
+
+        cases["api_dashboard_after_write"] = dashboard_after_write
+    if importlib.util.find_spec("numpy"):
+        cases["forecast_goals"] = forecast_goals
+        cases["simulate_payoff"] = lambda: simulate_payoff([step * 10.0 for step in range(101)])
+    return cases
+
+
+def run_setup_case(client, scratch: Path, iterations: int, warmup: int) -> dict:
+    payload = _setup_payload(SETUP_PAYLOAD_ROWS)
+    previous_path = database.DB_PATH
+    database.DB_PATH = scratch
+    try:
+        database.init_db()
+
+        def setup():
+            response = client.post("/api/setup", json=payload)
+            assert response.status_code == 201, response.get_json()
+
+        return time_case(setup, iterations, warmup)
+    finally:
+        database.DB_PATH = previous_path
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ledger_counts() -> dict:
+    return {
+        table: database.fetchone(f"SELECT COUNT(*) AS c FROM {table}")["c"]
+        for table in ("expenses", "goals", "recurring_expenses", "accounts", "debts")
+    }
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    lines = []
+    for name, current in results["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            lines.append(f"{name:<24} (new)")
+            continue
+        changes = []
+        for key in ("p50_ms", "p90_ms"):
+            delta = (current[key] - before[key]) / before[key] * 100.0 if before[key] else 0.0
+            changes.append(f"{key[:3]} {before[key]:.2f} -> {current[key]:.2f} ms ({delta:+.1f}%)")
+        lines.append(f"{name:<24} " + "  ".join(changes))
+    return lines
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the budget program against a synthetic ledger.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", help="benchmark an existing database (it is written to)")
+    source.add_argument("--size", choices=SIZES, default="small", help="generate a ledger of this size (default: small)")
+    parser.add_argument("--expenses", type=int, help="override the preset expense count")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", help="comma-separated case names to run")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    workdir = Path(tempfile.mkdtemp(prefix="budget-bench-"))
+    if args.db:
+        database.DB_PATH = Path(args.db)
+        database.init_db()
+    else:
+        counts = dict(SIZES[args.size])
+        if args.expenses is not None:
+            counts["expenses"] = args.expenses
+        started = time.perf_counter()
+        database.DB_PATH = generate_ledger(workdir / "ledger.db", **counts)
+        print(f"Generated {args.size} ledger in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    # web_app runs init_db on import, so it is imported once DB_PATH is set.
+    from web_app import app
+
+    client = app.test_client()
+    only = set(args.only.split(",")) if args.only else None
+    results = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "ledger": _ledger_counts(),
+            "iterations": args.iterations,
+        },
+        "results": {},
+    }
+
+    def record(name: str, summary: dict) -> None:
+        results["results"][name] = summary
+        print(f"{name:<24} p50 {summary['p50_ms']:>9.3f} ms  p90 {summary['p90_ms']:>9.3f} ms  p99 {summary['p99_ms']:>9.3f} ms")
+
+    for name, func in build_cases(client).items():
+        if only is None or name in only:
+            record(name, time_case(func, args.iterations, args.warmup))
+    if only is None or "setup" in only:
+        record("setup", run_setup_case(client, workdir / "setup.db", args.iterations, args.warmup))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare:
+        print()
+        print("\n".join(compare(results, json.loads(Path(args.compare).read_text()))))
+
+    database.close_all()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,42 +2,645 @@
 
 from __future__ import annotations
 
+import atexit
+import contextvars
+import itertools
+import os
+import queue
+import re
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import date, timedelta
 from pathlib import Path
 
+from money import to_cents
+
 DB_PATH = Path(__file__).resolve().parent / "budget.db"
 
+# Multi-household hosting: each ledger is its own SQLite file in LEDGER_DIR,
+# so ledgers never share locks or data. A request or CLI run selects one with
+# begin_ledger/use_ledger; without one, everything uses DB_PATH.
+LEDGER_DIR = Path(os.environ.get("BUDGET_LEDGER_DIR", str(Path(__file__).resolve().parent / "ledgers")))
+_LEDGER_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9_-]{0,63}")
+# Databases that keep a connection pool; the least recently used is closed
+# beyond this, so idle ledgers hold no file handles.
+MAX_OPEN_LEDGERS = int(os.environ.get("BUDGET_MAX_OPEN_LEDGERS", "64"))
+
+# Set BUDGET_READ_REPLICA=1 to answer read_replica() blocks (the web app's
+# cacheable GETs) from an in-memory copy of the database, so those reads never
+# wait on the file while imports and allocations write to it.
+READ_REPLICA = os.environ.get("BUDGET_READ_REPLICA") == "1"
+# Each copy reads the whole file, so during a burst of writes a replica is
+# refreshed at most this often and reads use the file in between. Also how
+# often a replica checks the file for commits from other processes.
+REPLICA_REFRESH_INTERVAL_MS = int(os.environ.get("BUDGET_READ_REPLICA_INTERVAL_MS", "1000"))
+
+# Connection tuning. Each value can be overridden through the environment so a
+# deployment can trade memory for fewer disk reads without editing code.
+POOL_SIZE = int(os.environ.get("BUDGET_DB_POOL_SIZE", "8"))
+CACHE_SIZE_KB = int(os.environ.get("BUDGET_DB_CACHE_KB", "16384"))
+MMAP_SIZE = int(os.environ.get("BUDGET_DB_MMAP_BYTES", str(128 * 1024 * 1024)))
+STATEMENT_CACHE_SIZE = int(os.environ.get("BUDGET_DB_STATEMENT_CACHE", "256"))
+BUSY_TIMEOUT_MS = int(os.environ.get("BUDGET_DB_BUSY_TIMEOUT_MS", "5000"))
+# Extra attempts at BEGIN IMMEDIATE when another writer still holds the lock
+# after the busy timeout, with exponential backoff starting at this delay.
+TRANSACTION_RETRIES = 3
+TRANSACTION_BACKOFF_S = 0.05
+
+# Bumped whenever init_db must migrate existing files (stored in PRAGMA user_version).
+# 1: money columns store integer cents instead of REAL dollars.
+# 2: expenses_fts full-text index over expense notes and tags.
+# 3: tags / expense_tags, filled from the comma-separated expenses.tags text.
+SCHEMA_VERSION = 3
+
+# Columns holding money, per table, converted by the cents migration.
+MONEY_COLUMNS = {
+    "accounts": {"balance"},
+    "debts": {"balance", "min_payment"},
+    "income_entries": {"amount"},
+    "income_profile": {"expected_amount"},
+    "recurring_expenses": {"amount"},
+    "expenses": {"amount", "paid_amount"},
+    "account_allocations": {"amount"},
+    "balance_updates": {"old_balance", "new_balance"},
+    "goals": {"start_amount", "target_amount", "contribution_limit", "contributed_so_far", "current_amount_override"},
+}
+
+# Idle connections, keyed by database path so that pointing DB_PATH somewhere
+# else (tests, scripts) never hands out a connection to the old file. Ordered
+# by last use for the MAX_OPEN_LEDGERS bound.
+_pools: OrderedDict[str, _LedgerPool] = OrderedDict()
+_pools_lock = threading.Lock()
+# In-memory copies for read_replica(), keyed and bounded like _pools.
+_replicas: OrderedDict[str, _Replica] = OrderedDict()
+# Every connection ever opened, so shutdown can close the ones still checked out.
+_open_connections: set[sqlite3.Connection] = set()
+# The connection pinned by an open transaction() on this thread, if any.
+_local = threading.local()
+
+# Slowest statements kept per QueryStats.
+SLOW_QUERY_SLOTS = 5
+
+
+class QueryStats:
+    """Query count, total time and the slowest statements for one unit of work."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest: list[tuple[float, str]] = []
+
+    def record(self, query: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if len(self.slowest) < SLOW_QUERY_SLOTS or elapsed_ms > self.slowest[-1][0]:
+            self.slowest.append((elapsed_ms, " ".join(query.split())))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOW_QUERY_SLOTS:]
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "slowest": [{"ms": round(ms, 3), "sql": sql} for ms, sql in self.slowest],
+        }
+
+
+# Stats for whatever is collecting in the current context (a web request or a
+# CLI action); None means nothing is collecting and queries are not timed.
+_query_stats: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar("query_stats", default=None)
+
+
+def begin_query_stats() -> tuple[QueryStats, contextvars.Token]:
+    """Start collecting for the current context; pass the token to end_query_stats."""
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+
+def end_query_stats(token: contextvars.Token) -> None:
+    _query_stats.reset(token)
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryStats]:
+    """Record every execute/executemany/fetchall/fetchone run inside the block."""
+    stats, token = begin_query_stats()
+    try:
+        yield stats
+    finally:
+        end_query_stats(token)
+
+
+@contextmanager
+def _timed(query: str) -> Iterator[None]:
+    stats = _query_stats.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.record(query, (time.perf_counter() - started) * 1000.0)
+
+
+# --- Ledgers -----------------------------------------------------------------
+
+# The selected ledger's file for the current context (a request, a CLI run);
+# None means DB_PATH.
+_ledger_path: contextvars.ContextVar[Path | None] = contextvars.ContextVar("ledger_path", default=None)
+# Ledger files init_db has already run on in this process.
+_initialized_ledgers: set[str] = set()
+_ledger_init_lock = threading.Lock()
+
+
+def ledger_path(name: str) -> Path:
+    """File for ledger ``name``: letters, digits, ``-`` and ``_``, up to 64 long."""
+    if not isinstance(name, str) or not _LEDGER_NAME.fullmatch(name):
+        raise ValueError("Ledger names use letters, digits, '-' and '_' (up to 64 characters).")
+    return LEDGER_DIR / f"{name}.db"
+
+
+def ledger_exists(name: str) -> bool:
+    return ledger_path(name).exists()
+
+
+def current_path() -> Path:
+    """The database file this context reads and writes."""
+    return _ledger_path.get() or Path(DB_PATH)
+
+
+def begin_ledger(name: str | None) -> contextvars.Token:
+    """Route this context's database calls to ledger ``name`` (None: DB_PATH).
+
+    The ledger's file is created and initialized the first time this process
+    uses it. Pass the token to end_ledger.
+    """
+    path = ledger_path(name) if name is not None else None
+    token = _ledger_path.set(path)
+    if path is None or (str(path) in _initialized_ledgers and path.exists()):
+        return token
+    try:
+        with _ledger_init_lock:
+            if str(path) not in _initialized_ledgers or not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                init_db()
+                _initialized_ledgers.add(str(path))
+    except BaseException:
+        _ledger_path.reset(token)
+        raise
+    return token
+
+
+def end_ledger(token: contextvars.Token) -> None:
+    _ledger_path.reset(token)
+
+
+@contextmanager
+def use_ledger(name: str | None) -> Iterator[Path]:
+    """Run a block against ledger ``name`` (None: DB_PATH)."""
+    token = begin_ledger(name)
+    try:
+        yield current_path()
+    finally:
+        end_ledger(token)
+
+
+# --- Connections -------------------------------------------------------------
 
 def connect() -> sqlite3.Connection:
-    """Return a SQLite connection with foreign keys enabled and row dictionaries."""
-    conn = sqlite3.connect(DB_PATH)
+    """Open a new tuned SQLite connection with foreign keys enabled and row dictionaries.
+
+    Most callers should go through execute/fetchall/fetchone, which reuse pooled
+    connections instead of paying this setup cost on every query.
+    """
+    conn = sqlite3.connect(
+        current_path(),
+        timeout=BUSY_TIMEOUT_MS / 1000.0,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,
+    )
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    # NORMAL is durable under WAL except for the last commits on power loss.
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    with _pools_lock:
+        _open_connections.add(conn)
     return conn
 
 
+class _LedgerPool:
+    """Idle connections to one database file.
+
+    Once evicted (or closed by close_all) it takes no connections back:
+    _release closes them instead.
+    """
+
+    def __init__(self) -> None:
+        self.idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=POOL_SIZE)
+        self.evicted = False
+
+    def evict(self) -> list[sqlite3.Connection]:
+        """Mark evicted and return the idle connections to close. Hold _pools_lock."""
+        self.evicted = True
+        idle = []
+        while not self.idle.empty():
+            idle.append(self.idle.get_nowait())
+        return idle
+
+
+def _pool() -> _LedgerPool:
+    key = str(current_path())
+    idle = []
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = _LedgerPool()
+            while len(_pools) > MAX_OPEN_LEDGERS:
+                # Connections still checked out are closed on release.
+                idle += _pools.popitem(last=False)[1].evict()
+        else:
+            _pools.move_to_end(key)
+    for conn in idle:
+        _discard(conn)
+    return pool
+
+
+def _discard(conn: sqlite3.Connection) -> None:
+    with _pools_lock:
+        _open_connections.discard(conn)
+    conn.close()
+
+
+def _acquire() -> tuple[sqlite3.Connection, _LedgerPool]:
+    pool = _pool()
+    try:
+        return pool.idle.get_nowait(), pool
+    except queue.Empty:
+        return connect(), pool
+
+
+def _release(conn: sqlite3.Connection, pool: _LedgerPool) -> None:
+    if conn.in_transaction:
+        conn.rollback()
+    with _pools_lock:
+        if not pool.evicted:
+            try:
+                pool.idle.put_nowait(conn)
+                return
+            except queue.Full:
+                pass
+    _discard(conn)
+
+
+def close_all() -> None:
+    """Close every pooled connection and replica. Safe to call more than once."""
+    with _pools_lock:
+        connections = list(_open_connections)
+        _open_connections.clear()
+        for pool in _pools.values():
+            pool.evict()
+        _pools.clear()
+        replicas = list(_replicas.values())
+        _replicas.clear()
+    for replica in replicas:
+        replica.close()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+atexit.register(close_all)
+
+
+def _in_transaction() -> bool:
+    return getattr(_local, "conn", None) is not None
+
+
+@contextmanager
+def _connection() -> Iterator[sqlite3.Connection]:
+    """Yield the thread's transaction connection, or borrow one from the pool."""
+    pinned = getattr(_local, "conn", None)
+    if pinned is not None:
+        yield pinned
+        return
+    conn, pool = _acquire()
+    try:
+        yield conn
+    finally:
+        _release(conn, pool)
+
+
+def _bump_data_version(conn: sqlite3.Connection) -> None:
+    # Rides along in the writer's transaction, so readers never see new data
+    # under an old version number.
+    conn.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+
+def data_version() -> int:
+    """Return a counter that increases with every committed write.
+
+    Cheap to read, and shared by every process using the database file, so it
+    can back HTTP validators (ETags) and cache invalidation.
+    """
+    row = fetchone("SELECT version FROM data_version WHERE id = 1")
+    return int(row["version"]) if row else 0
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """Run a block as one ``BEGIN IMMEDIATE`` transaction.
+
+    The write lock is taken up front, so reads inside the block see a state no
+    other writer can change before commit. execute/fetchall/fetchone called
+    inside the block join the transaction instead of committing on their own.
+    Any exception rolls everything back. Nested calls join the outer
+    transaction.
+    """
+    if _in_transaction():
+        yield _local.conn
+        return
+
+    conn, pool = _acquire()
+    try:
+        for attempt in range(TRANSACTION_RETRIES + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as error:
+                if not _is_busy(error) or attempt == TRANSACTION_RETRIES:
+                    raise
+                time.sleep(TRANSACTION_BACKOFF_S * (2**attempt))
+
+        _local.conn = conn
+        try:
+            yield conn
+            _bump_data_version(conn)
+            conn.commit()
+            _note_write()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            _local.conn = None
+    finally:
+        _release(conn, pool)
+
+
+# --- Read replica ------------------------------------------------------------
+
+# Names for the shared-cache in-memory databases, unique for the process.
+_replica_names = itertools.count(1)
+
+
+class _Replica:
+    """An in-memory copy of one database file, with its own reader pool.
+
+    The copy is a shared-cache in-memory database, so every pooled reader
+    connection sees the same pages and readers run side by side. A refresh
+    copies the file into a new one with the backup API on a background
+    thread, then swaps it in. The old copy's readers are closed as they come
+    back, so no request ever waits for a copy.
+
+    ``writes`` counts the commits this process has noticed; the copy is
+    current while it matches ``copied_writes``. Fields are guarded by
+    _pools_lock.
+    """
+
+    def __init__(self) -> None:
+        self.uri: str | None = None
+        # Keeps the in-memory database alive while no reader is open.
+        self.holder: sqlite3.Connection | None = None
+        self.readers: _LedgerPool | None = None
+        self.version = -1
+        self.writes = 0
+        self.copied_writes = -1
+        self.closed = False
+        self.checked_at = float("-inf")
+        self.refreshed_at = float("-inf")
+        self.refresh_lock = threading.Lock()
+
+    def ready(self) -> bool:
+        """True when reads can use the copy; starts a refresh when it is behind.
+
+        Commits made in this process mark the copy behind at once. Commits
+        from other processes are noticed by reading data_version() from the
+        file, at most once per REPLICA_REFRESH_INTERVAL_MS.
+        """
+        now = time.monotonic()
+        with _pools_lock:
+            behind = self.readers is None or self.writes != self.copied_writes
+            check = not behind and (now - self.checked_at) * 1000.0 >= REPLICA_REFRESH_INTERVAL_MS
+            if check:
+                self.checked_at = now
+        if check and data_version() != self.version:
+            with _pools_lock:
+                self.writes += 1
+            behind = True
+        if behind:
+            self.refresh_soon()
+        return not behind
+
+    def refresh_soon(self) -> None:
+        """Start a refresh unless one is running or the last was too recent."""
+        if (time.monotonic() - self.refreshed_at) * 1000.0 < REPLICA_REFRESH_INTERVAL_MS:
+            return
+        if not self.refresh_lock.acquire(blocking=False):
+            return
+        self.refreshed_at = time.monotonic()
+        # The copied context keeps the ledger selection, so the thread copies
+        # the same file.
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(self._refresh,), daemon=True).start()
+
+    def _refresh(self) -> None:
+        try:
+            with _pools_lock:
+                writes = self.writes
+            uri = f"file:replica-{next(_replica_names)}?mode=memory&cache=shared"
+            holder = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            with _connection() as conn:
+                conn.backup(holder)
+            # Read from the copy itself: it may hold commits newer than the
+            # ones that made it stale.
+            copied = int(holder.execute("SELECT version FROM data_version WHERE id = 1").fetchone()[0])
+            with _pools_lock:
+                if self.closed:
+                    old_holder, old_readers = holder, None
+                else:
+                    old_holder, old_readers = self.holder, self.readers
+                    self.uri, self.holder, self.readers = uri, holder, _LedgerPool()
+                    self.version, self.copied_writes = copied, writes
+                    self.checked_at = time.monotonic()
+                idle = old_readers.evict() if old_readers is not None else []
+            for conn in idle:
+                _discard(conn)
+            if old_holder is not None:
+                old_holder.close()
+        except sqlite3.Error:
+            pass  # Reads keep using the file; the next one retries.
+        finally:
+            self.refresh_lock.release()
+
+    def acquire(self) -> tuple[sqlite3.Connection, _LedgerPool] | None:
+        """Borrow a reader connection; None once the replica is closed."""
+        with _pools_lock:
+            readers = self.readers
+            if readers is None:
+                return None
+            try:
+                return readers.idle.get_nowait(), readers
+            except queue.Empty:
+                pass
+            # Opened under the lock so a refresh cannot close the copy's last
+            # connection first, which would discard the in-memory database.
+            conn = sqlite3.connect(
+                self.uri, uri=True, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+            )
+            _open_connections.add(conn)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn, readers
+
+    def close(self) -> None:
+        with _pools_lock:
+            self.closed = True
+            holder, readers = self.holder, self.readers
+            self.holder = self.readers = None
+            idle = readers.evict() if readers is not None else []
+        for conn in idle:
+            _discard(conn)
+        if holder is not None:
+            holder.close()
+
+
+# The replica serving reads in the current context, set by read_replica().
+_replica: contextvars.ContextVar[_Replica | None] = contextvars.ContextVar("replica", default=None)
+
+
+def _current_replica() -> _Replica:
+    key = str(current_path())
+    stale = []
+    with _pools_lock:
+        replica = _replicas.get(key)
+        if replica is None:
+            replica = _replicas[key] = _Replica()
+            while len(_replicas) > MAX_OPEN_LEDGERS:
+                stale.append(_replicas.popitem(last=False)[1])
+        else:
+            _replicas.move_to_end(key)
+    for evicted in stale:
+        evicted.close()
+    return replica
+
+
+def _note_write() -> None:
+    """Mark the current file's replica behind after a commit in this process."""
+    if not READ_REPLICA:
+        return
+    with _pools_lock:
+        replica = _replicas.get(str(current_path()))
+        if replica is not None:
+            replica.writes += 1
+
+
+@contextmanager
+def read_replica() -> Iterator[None]:
+    """Serve the block's fetchall/fetchone (data_version too) from the replica.
+
+    The replica is used only while it holds every commit this process has
+    made. Commits from other processes reach it within
+    REPLICA_REFRESH_INTERVAL_MS. When it is behind, the block reads the file
+    as usual and a refresh starts in the background. Use it for read-only
+    code: writes still go to the file, but later reads in the block may not
+    see them. Does nothing unless READ_REPLICA is on. Reads inside a
+    transaction always use the file.
+    """
+    if not READ_REPLICA or _in_transaction() or _replica.get() is not None:
+        yield
+        return
+    replica = _current_replica()
+    if not replica.ready():
+        yield
+        return
+    token = _replica.set(replica)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+@contextmanager
+def _read_connection() -> Iterator[sqlite3.Connection]:
+    replica = _replica.get()
+    borrowed = replica.acquire() if replica is not None and not _in_transaction() else None
+    if borrowed is None:
+        with _connection() as conn:
+            yield conn
+        return
+    conn, readers = borrowed
+    try:
+        yield conn
+    finally:
+        _release(conn, readers)
+
+
 def execute(query: str, params: tuple = ()) -> int:
     """Execute a write query and return lastrowid."""
-    with connect() as conn:
+    with _connection() as conn, _timed(query):
         cursor = conn.execute(query, params)
-        conn.commit()
+        if not _in_transaction():
+            _bump_data_version(conn)
+            conn.commit()
+            _note_write()
         return cursor.lastrowid
 
 
+def executemany(query: str, rows: Iterable[tuple]) -> int:
+    """Execute a write query once per parameter tuple and return the row count."""
+    with _connection() as conn, _timed(query):
+        cursor = conn.executemany(query, rows)
+        if not _in_transaction():
+            _bump_data_version(conn)
+            conn.commit()
+            _note_write()
+        return cursor.rowcount
+
+
 def fetchall(query: str, params: tuple = ()) -> list[sqlite3.Row]:
     """Fetch all rows for a query."""
-    with connect() as conn:
+    with _read_connection() as conn, _timed(query):
         return conn.execute(query, params).fetchall()
 
 
 def fetchone(query: str, params: tuple = ()) -> sqlite3.Row | None:
     """Fetch one row for a query."""
-    with connect() as conn:
+    with _read_connection() as conn, _timed(query):
         return conn.execute(query, params).fetchone()
 
 
 def init_db() -> None:
-    """Create all tables needed by the budget program."""
+    """Create all tables needed by the budget program.
+
+    Every money column holds integer cents (see money.py); rates and
+    percentages stay REAL.
+    """
     schema_statements = [
         """
         CREATE TABLE IF NOT EXISTS accounts(
@@ -45,7 +648,7 @@ def init_db() -> None:
             name TEXT NOT NULL,
             institution TEXT,
             type TEXT NOT NULL,
-            balance REAL NOT NULL,
+            balance INTEGER NOT NULL,
             interest_rate REAL,
             created_at TEXT NOT NULL
         )
@@ -56,9 +659,9 @@ def init_db() -> None:
             name TEXT NOT NULL,
             institution TEXT,
             type TEXT NOT NULL,
-            balance REAL NOT NULL,
+            balance INTEGER NOT NULL,
             interest_rate REAL,
-            min_payment REAL,
+            min_payment INTEGER,
             due_day INTEGER,
             created_at TEXT NOT NULL
         )
@@ -81,7 +684,7 @@ def init_db() -> None:
         CREATE TABLE IF NOT EXISTS income_entries(
             id INTEGER PRIMARY KEY,
             date TEXT NOT NULL,
-            amount REAL NOT NULL,
+            amount INTEGER NOT NULL,
             source TEXT,
             note TEXT
         )
@@ -91,7 +694,7 @@ def init_db() -> None:
         """
         CREATE TABLE IF NOT EXISTS income_profile(
             id INTEGER PRIMARY KEY CHECK (id = 1),
-            expected_amount REAL,
+            expected_amount INTEGER,
             cadence TEXT,
             updated_at TEXT NOT NULL
         )
@@ -102,7 +705,7 @@ def init_db() -> None:
         CREATE TABLE IF NOT EXISTS recurring_expenses(
             id INTEGER PRIMARY KEY,
             name TEXT NOT NULL,
-            amount REAL NOT NULL,
+            amount INTEGER NOT NULL,
             cadence TEXT NOT NULL,
             category_id INTEGER,
             due_day INTEGER,
@@ -115,9 +718,9 @@ def init_db() -> None:
         CREATE TABLE IF NOT EXISTS expenses(
             id INTEGER PRIMARY KEY,
             date TEXT NOT NULL,
-            amount REAL NOT NULL,
+            amount INTEGER NOT NULL,
             category_id INTEGER NOT NULL,
-            paid_amount REAL NOT NULL DEFAULT 0,
+            paid_amount INTEGER NOT NULL DEFAULT 0,
             note TEXT,
             tags TEXT,
             FOREIGN KEY(category_id) REFERENCES categories(id)
@@ -130,7 +733,7 @@ def init_db() -> None:
             account_id INTEGER NOT NULL,
             target_type TEXT NOT NULL,
             target_id INTEGER NOT NULL,
-            amount REAL NOT NULL,
+            amount INTEGER NOT NULL,
             note TEXT,
             FOREIGN KEY(account_id) REFERENCES accounts(id)
         )
@@ -141,11 +744,23 @@ def init_db() -> None:
             date TEXT NOT NULL,
             entity_type TEXT NOT NULL,
             entity_id INTEGER NOT NULL,
-            old_balance REAL NOT NULL,
-            new_balance REAL NOT NULL,
+            old_balance INTEGER NOT NULL,
+            new_balance INTEGER NOT NULL,
             note TEXT
         )
         """,
+        # Month-end balance checkpoints for every account/debt that existed on
+        # that date, so balance history replays a month of balance_updates at
+        # most instead of the whole log. Written by checkpoint_balances.
+        """
+        CREATE TABLE IF NOT EXISTS balance_snapshots(
+            date TEXT NOT NULL,
+            entity_type TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            balance INTEGER NOT NULL,
+            PRIMARY KEY(date, entity_type, entity_id)
+        ) WITHOUT ROWID
+        """,
         """
         CREATE TABLE IF NOT EXISTS goals(
             id INTEGER PRIMARY KEY,
@@ -153,22 +768,357 @@ def init_db() -> None:
             name TEXT NOT NULL,
             link_type TEXT,
             link_id INTEGER,
-            start_amount REAL,
-            target_amount REAL,
+            start_amount INTEGER,
+            target_amount INTEGER,
             target_date TEXT,
             year INTEGER,
-            contribution_limit REAL,
-            contributed_so_far REAL,
-            current_amount_override REAL,
+            contribution_limit INTEGER,
+            contributed_so_far INTEGER,
+            current_amount_override INTEGER,
             created_at TEXT NOT NULL
         )
         """,
+        # Normalized tags. expenses.tags keeps the text as entered (for display
+        # and search); expense_tags mirrors it, one lowercase tag per row.
+        """
+        CREATE TABLE IF NOT EXISTS tags(
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS expense_tags(
+            expense_id INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            PRIMARY KEY(expense_id, tag_id),
+            FOREIGN KEY(expense_id) REFERENCES expenses(id) ON DELETE CASCADE,
+            FOREIGN KEY(tag_id) REFERENCES tags(id)
+        ) WITHOUT ROWID
+        """,
+        # Per-category spend per month (YYYY-MM), kept current by the triggers
+        # below so month views read O(categories) rows instead of summing expenses.
+        """
+        CREATE TABLE IF NOT EXISTS category_month_totals(
+            category_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            spent INTEGER NOT NULL DEFAULT 0,
+            expense_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY(category_id, month)
+        ) WITHOUT ROWID
+        """,
+        # Single row bumped by every write through execute/executemany/transaction.
+        """
+        CREATE TABLE IF NOT EXISTS data_version(
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO data_version(id, version) VALUES (1, 0)",
     ]
 
-    with connect() as conn:
-        for stmt in schema_statements:
+    # Month views filter on date ranges (date >= first-of-month AND date < next
+    # month), which these indexes turn into range seeks instead of table scans.
+    index_statements = [
+        "CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date)",
+        "CREATE INDEX IF NOT EXISTS idx_expenses_category_date ON expenses(category_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_income_entries_date ON income_entries(date)",
+        "CREATE INDEX IF NOT EXISTS idx_balance_updates_entity ON balance_updates(entity_type, entity_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_balance_updates_date ON balance_updates(date)",
+        "CREATE INDEX IF NOT EXISTS idx_categories_parent ON categories(parent_id)",
+        "CREATE INDEX IF NOT EXISTS idx_account_allocations_account ON account_allocations(account_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_expense_tags_tag ON expense_tags(tag_id, expense_id)",
+    ]
+
+    # Every write path (service calls, setup, bulk imports, ad-hoc SQL) goes
+    # through these, so the monthly totals can never drift from expenses.
+    trigger_statements = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_totals_insert AFTER INSERT ON expenses
+        BEGIN
+            INSERT INTO category_month_totals(category_id, month, spent, expense_count)
+            VALUES (NEW.category_id, substr(NEW.date, 1, 7), NEW.amount, 1)
+            ON CONFLICT(category_id, month) DO UPDATE SET
+                spent = spent + excluded.spent,
+                expense_count = expense_count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_totals_delete AFTER DELETE ON expenses
+        BEGIN
+            UPDATE category_month_totals
+            SET spent = spent - OLD.amount, expense_count = expense_count - 1
+            WHERE category_id = OLD.category_id AND month = substr(OLD.date, 1, 7);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_totals_update
+        AFTER UPDATE OF date, amount, category_id ON expenses
+        BEGIN
+            UPDATE category_month_totals
+            SET spent = spent - OLD.amount, expense_count = expense_count - 1
+            WHERE category_id = OLD.category_id AND month = substr(OLD.date, 1, 7);
+            INSERT INTO category_month_totals(category_id, month, spent, expense_count)
+            VALUES (NEW.category_id, substr(NEW.date, 1, 7), NEW.amount, 1)
+            ON CONFLICT(category_id, month) DO UPDATE SET
+                spent = spent + excluded.spent,
+                expense_count = expense_count + 1;
+        END
+        """,
+        # A back-dated balance update also moves every checkpoint taken after
+        # its date, so checkpoints stay equal to a full replay of the log.
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_balance_updates_snapshots AFTER INSERT ON balance_updates
+        BEGIN
+            UPDATE balance_snapshots SET balance = balance + NEW.new_balance - NEW.old_balance
+            WHERE entity_type = NEW.entity_type AND entity_id = NEW.entity_id AND date >= NEW.date;
+        END
+        """,
+    ]
+
+    # External-content FTS5 index: stores only the search index and reads the
+    # text back from expenses, so notes and tags are not duplicated on disk.
+    search_statements = [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5(
+            note, tags, content='expenses', content_rowid='id'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_fts_insert AFTER INSERT ON expenses
+        BEGIN
+            INSERT INTO expenses_fts(rowid, note, tags) VALUES (NEW.id, NEW.note, NEW.tags);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_fts_delete AFTER DELETE ON expenses
+        BEGIN
+            INSERT INTO expenses_fts(expenses_fts, rowid, note, tags) VALUES ('delete', OLD.id, OLD.note, OLD.tags);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_fts_update AFTER UPDATE OF note, tags ON expenses
+        BEGIN
+            INSERT INTO expenses_fts(expenses_fts, rowid, note, tags) VALUES ('delete', OLD.id, OLD.note, OLD.tags);
+            INSERT INTO expenses_fts(rowid, note, tags) VALUES (NEW.id, NEW.note, NEW.tags);
+        END
+        """,
+    ]
+
+    conn, pool = _acquire()
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            _migrate_money_to_cents(conn, schema_statements)
+        for stmt in schema_statements + index_statements + trigger_statements:
             conn.execute(stmt)
+        _backfill_category_month_totals(conn)
+        if _create_expense_search(conn, search_statements) and version < 2:
+            conn.execute("INSERT INTO expenses_fts(expenses_fts) VALUES ('rebuild')")
+        if version < 3:
+            for stmt in _EXPENSE_TAG_SYNC:
+                conn.execute(stmt, (0, _MAX_ROWID))
+        through = _checkpoint_balances(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
+        _checkpointed_through[str(current_path())] = through
+    finally:
+        _release(conn, pool)
+
+
+# Rebuilds expense_tags for expenses with ids in [?, ?] from their tags text.
+# The recursive CTE splits the comma-separated list in SQL, so a whole import
+# or migration is three statements rather than a round trip per row.
+_SPLIT_EXPENSE_TAGS = """
+    WITH RECURSIVE split(expense_id, tag, rest) AS (
+        SELECT id, NULL, tags || ',' FROM expenses WHERE id BETWEEN ?1 AND ?2 AND tags IS NOT NULL
+        UNION ALL
+        SELECT expense_id, lower(trim(substr(rest, 1, instr(rest, ',') - 1))), substr(rest, instr(rest, ',') + 1)
+        FROM split WHERE rest != ''
+    )
+"""
+_EXPENSE_TAG_SYNC = (
+    "DELETE FROM expense_tags WHERE expense_id BETWEEN ?1 AND ?2",
+    f"INSERT OR IGNORE INTO tags(name) {_SPLIT_EXPENSE_TAGS} SELECT DISTINCT tag FROM split WHERE tag != ''",
+    f"""
+    INSERT OR IGNORE INTO expense_tags(expense_id, tag_id) {_SPLIT_EXPENSE_TAGS}
+    SELECT s.expense_id, t.id FROM split s JOIN tags t ON t.name = s.tag
+    """,
+)
+_MAX_ROWID = 2**63 - 1
+
+
+def sync_expense_tags(first_id: int, last_id: int | None = None) -> None:
+    """Refresh expense_tags for expenses ``first_id``..``last_id`` (default: all after)."""
+    with transaction():
+        for stmt in _EXPENSE_TAG_SYNC:
+            execute(stmt, (first_id, _MAX_ROWID if last_id is None else last_id))
+
+
+# The month end each database file was last checkpointed through, so
+# checkpoint_balances only touches the file once a month.
+_checkpointed_through: dict[str, date] = {}
+
+
+def _checkpoint_balances(conn: sqlite3.Connection) -> date:
+    """Add month-end balance checkpoints up to the end of last month; return it.
+
+    Balances are walked back from the current ones, undoing balance_updates
+    newest first, so only the updates after the earliest new checkpoint are
+    read: about a month of them once checkpoints are current, the whole log
+    the first time.
+    """
+    through = date.today().replace(day=1) - timedelta(days=1)
+    latest = conn.execute("SELECT MAX(date) FROM balance_snapshots").fetchone()[0]
+    if latest:
+        first = date.fromisoformat(latest) + timedelta(days=1)
+    else:
+        earliest = conn.execute(
+            """
+            SELECT MIN(d) FROM (
+                SELECT MIN(created_at) AS d FROM accounts
+                UNION ALL SELECT MIN(created_at) FROM debts
+                UNION ALL SELECT MIN(date) FROM balance_updates
+            )
+            """
+        ).fetchone()[0]
+        if not earliest:
+            return through
+        first = date.fromisoformat(earliest[:10])
+    month_ends = []
+    month = first.replace(day=1)
+    while True:
+        month = (month + timedelta(days=32)).replace(day=1)
+        month_end = month - timedelta(days=1)
+        if month_end > through:
+            break
+        month_ends.append(month_end.isoformat())
+    if not month_ends:
+        return through
+
+    entities = conn.execute(
+        """
+        SELECT 'account' AS entity_type, id, balance, created_at FROM accounts
+        UNION ALL
+        SELECT 'debt', id, balance, created_at FROM debts
+        """
+    ).fetchall()
+    balances = {(r[0], r[1]): r[2] for r in entities}
+    created = {(r[0], r[1]): r[3][:10] for r in entities}
+    updates = conn.execute(
+        """
+        SELECT date, entity_type, entity_id, new_balance - old_balance
+        FROM balance_updates WHERE date > ? ORDER BY date DESC
+        """,
+        (month_ends[0],),
+    ).fetchall()
+
+    rows = []
+    position = 0
+    for month_end in reversed(month_ends):
+        while position < len(updates) and updates[position][0] > month_end:
+            _, entity_type, entity_id, delta = updates[position]
+            key = (entity_type, entity_id)
+            if key in balances:
+                balances[key] -= delta
+            position += 1
+        rows.extend(
+            (month_end, key[0], key[1], balance) for key, balance in balances.items() if created[key] <= month_end
+        )
+    conn.executemany(
+        "INSERT OR REPLACE INTO balance_snapshots(date, entity_type, entity_id, balance) VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    return through
+
+
+def checkpoint_balances() -> None:
+    """Bring the month-end balance checkpoints up to date.
+
+    init_db runs this at startup, and balance writers call it at the start
+    of their transaction so a process running into a new month adds last
+    month's checkpoint. Only the first call each month touches the
+    database. Reads never need it: balances are walked back from the
+    current ones whether a checkpoint exists or not, so they stay read-only.
+    """
+    through = date.today().replace(day=1) - timedelta(days=1)
+    key = str(current_path())
+    if _checkpointed_through.get(key) == through:
+        return
+    with transaction() as conn:
+        _checkpointed_through[key] = _checkpoint_balances(conn)
+
+
+def _create_expense_search(conn: sqlite3.Connection, search_statements: list[str]) -> bool:
+    """Create the full-text index; False if this SQLite build lacks FTS5."""
+    try:
+        for stmt in search_statements:
+            conn.execute(stmt)
+    except sqlite3.OperationalError as error:
+        if "fts5" not in str(error):
+            raise
+        return False
+    return True
+
+
+def _migrated_cents(value):
+    return to_cents(value) if isinstance(value, (int, float)) else value
+
+
+def _migrate_money_to_cents(conn: sqlite3.Connection, schema_statements: list[str]) -> None:
+    """Rewrite a pre-cents database (REAL dollar columns) to integer cents.
+
+    SQLite cannot change a column's type in place, so each table is rebuilt
+    from its current CREATE statement and copied across with dollars scaled
+    to cents. Tables are dropped and renamed with foreign keys off, and the
+    whole rewrite is one transaction. Indexes and triggers on rebuilt tables
+    are recreated by init_db afterwards.
+    """
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "accounts" not in existing:
+        return  # Fresh database: init_db creates the cents schema directly.
+
+    # Rounded like money.to_cents: SQL ROUND(1.005 * 100) is 100, not 101.
+    conn.create_function("to_cents", 1, _migrated_cents, deterministic=True)
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for stmt in schema_statements:
+            match = re.search(r"CREATE TABLE IF NOT EXISTS (\w+)\(", stmt)
+            if not match or match.group(1) not in existing or match.group(1) not in MONEY_COLUMNS:
+                continue
+            table = match.group(1)
+            money_columns = MONEY_COLUMNS[table]
+            columns = [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+            select = ", ".join(
+                f"to_cents({col})" if col in money_columns else col for col in columns
+            )
+            conn.execute(stmt.replace(f"CREATE TABLE IF NOT EXISTS {table}(", f"CREATE TABLE _cents_{table}(", 1))
+            conn.execute(f"INSERT INTO _cents_{table}({', '.join(columns)}) SELECT {select} FROM {table}")
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE _cents_{table} RENAME TO {table}")
+        # Rebuilt from the converted expenses by _backfill_category_month_totals.
+        conn.execute("DROP TABLE IF EXISTS category_month_totals")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+
+
+def _backfill_category_month_totals(conn: sqlite3.Connection) -> None:
+    """Seed the monthly totals for databases created before the table existed."""
+    if conn.execute("SELECT 1 FROM category_month_totals LIMIT 1").fetchone():
+        return
+    conn.execute(
+        """
+        INSERT INTO category_month_totals(category_id, month, spent, expense_count)
+        SELECT category_id, substr(date, 1, 7), SUM(amount), COUNT(*)
+        FROM expenses
+        GROUP BY category_id, substr(date, 1, 7)
+        """
+    )
 
 
 def has_initial_data() -> bool:
@@ -0,0 +1,63 @@
+"""In-process fan-out of dashboard change events to server-sent-event streams."""
+
+from __future__ import annotations
+
+import queue
+import threading
+
+# Events a slow client may fall behind by before it is told to resync.
+MAX_QUEUED_EVENTS = 100
+
+
+class EventBroker:
+    """Hands every published event to each subscriber's own queue.
+
+    Subscribers listen to one topic (the ledger whose dashboard they show)
+    and only receive events published to it. Publishing never blocks: a
+    subscriber whose queue is full has its backlog replaced by a single
+    ``resync`` event, which tells the client to reload instead of replaying
+    stale deltas.
+    """
+
+    def __init__(self, max_queued: int = MAX_QUEUED_EVENTS) -> None:
+        self._max_queued = max_queued
+        self._subscribers: dict[str, set[queue.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str = "") -> queue.Queue:
+        subscriber: queue.Queue = queue.Queue(maxsize=self._max_queued)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue, topic: str = "") -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def has_subscribers(self, topic: str = "") -> bool:
+        return topic in self._subscribers
+
+    def publish(self, event: dict, topic: str = "") -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                _drain(subscriber)
+                subscriber.put_nowait({"type": "resync", "version": event.get("version")})
+
+
+def _drain(subscriber: queue.Queue) -> None:
+    while True:
+        try:
+            subscriber.get_nowait()
+        except queue.Empty:
+            return
+
+
+broker = EventBroker()
@@ -0,0 +1,43 @@
+"""Gunicorn settings for the budget dashboard.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+``python run_web.py --production`` runs exactly this. Settings come from the
+environment so a deployment can tune them without editing the file.
+"""
+
+import os
+
+bind = os.environ.get("BUDGET_WEB_BIND", "127.0.0.1:5000")
+workers = int(os.environ.get("BUDGET_WEB_WORKERS", str(os.cpu_count() or 1)))
+# Threaded workers: SQLite releases the GIL while it works, and each open
+# dashboard's live-update stream holds a thread for as long as it is open
+# (up to BUDGET_MAX_EVENT_STREAMS, half the threads by default).
+worker_class = "gthread"
+threads = int(os.environ.get("BUDGET_WEB_THREADS", "8"))
+timeout = int(os.environ.get("BUDGET_WEB_TIMEOUT", "60"))
+# On SIGTERM, in-flight requests get this long before workers are killed.
+graceful_timeout = int(os.environ.get("BUDGET_WEB_GRACEFUL_TIMEOUT", "10"))
+
+# Import the app in the master, so init_db and any migration run once rather
+# than racing in every worker.
+preload_app = True
+
+# One pooled connection per thread. WAL mode lets the workers read while one
+# of them writes. The busy timeout and BEGIN IMMEDIATE retries in database.py
+# queue writers up across processes.
+os.environ.setdefault("BUDGET_DB_POOL_SIZE", str(threads))
+
+
+def pre_fork(server, worker):
+    # SQLite connections must not be shared across fork(): drop the ones the
+    # master opened while loading the app. Each worker opens its own.
+    import database
+
+    database.close_all()
+
+
+def worker_exit(server, worker):
+    import database
+
+    database.close_all()
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import argparse
+import os
+import sys
 from datetime import date
 from typing import Callable
 
-from database import execute, fetchall, fetchone, has_initial_data, init_db
+from database import QueryStats, begin_ledger, collect_queries, execute, fetchall, fetchone, has_initial_data, init_db
+from money import to_cents, to_dollars
 from services.allocations import add_expense
+from services.balances import set_balance
 from services.budget import (
     add_income,
     add_recurring,
@@ -15,7 +20,8 @@ from services.budget import (
     set_income_profile,
 )
 from services.goals import add_goal, delete_goal, get_goal_progress, list_goals, update_goal
-from services.reports import print_dashboard, print_history
+from services.imports import IMPORT_FORMATS, IMPORT_KINDS, detect_format, import_transactions
+from services.reports import print_dashboard, print_history, print_trends
 
 DEFAULT_CATEGORIES = [
     ("Groceries", 30.0),
@@ -95,7 +101,7 @@ def setup_wizard() -> None:
         rate = float(rate_raw) if rate_raw else None
         execute(
             "INSERT INTO accounts(name, institution, type, balance, interest_rate, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-            (name, institution or None, account_type, balance, rate, date.today().isoformat()),
+            (name, institution or None, account_type, to_cents(balance), rate, date.today().isoformat()),
         )
         print("✓ Account added")
 
@@ -120,9 +126,9 @@ def setup_wizard() -> None:
                 name,
                 institution or None,
                 debt_type,
-                balance,
+                to_cents(balance),
                 float(rate_raw) if rate_raw else None,
-                float(min_payment_raw) if min_payment_raw else None,
+                to_cents(min_payment_raw) if min_payment_raw else None,
                 int(due_day_raw) if due_day_raw else None,
                 date.today().isoformat(),
             ),
@@ -254,7 +260,7 @@ def list_accounts() -> None:
     rows = fetchall("SELECT * FROM accounts ORDER BY id")
     print("\nAccounts")
     for r in rows:
-        print(f"  [{r['id']}] {r['name']} ({r['type']}) ${r['balance']:.2f}")
+        print(f"  [{r['id']}] {r['name']} ({r['type']}) ${to_dollars(r['balance']):.2f}")
     if not rows:
         print("  (none)")
 
@@ -263,7 +269,7 @@ def list_debts() -> None:
     rows = fetchall("SELECT * FROM debts ORDER BY id")
     print("\nDebts")
     for r in rows:
-        print(f"  [{r['id']}] {r['name']} ({r['type']}) ${r['balance']:.2f}")
+        print(f"  [{r['id']}] {r['name']} ({r['type']}) ${to_dollars(r['balance']):.2f}")
     if not rows:
         print("  (none)")
 
@@ -332,6 +338,25 @@ def add_expense_cli() -> None:
     print(f"Expense {eid} added.")
 
 
+def run_import(path: str, fmt: str | None = None, category_id: int | None = None, kind: str | None = None) -> None:
+    fmt = fmt or detect_format(path)
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as handle:
+        result = import_transactions(handle, fmt, default_category_id=category_id, kind=kind)
+    print(f"Imported {result['expenses']} expenses and {result['income']} income entries; skipped {result['skipped']}.")
+    for error in result["errors"]:
+        print(f"  ! {error}")
+
+
+def import_cli() -> None:
+    path = prompt_text("Path to CSV/OFX/QFX file")
+    if not path:
+        return
+    list_categories()
+    category_id = prompt_int("Default category ID for expenses (blank for none)", allow_blank=True)
+    kind = prompt_text("Treat every row as expense/income (blank = by sign)", "") or None
+    run_import(path, category_id=category_id, kind=kind)
+
+
 def update_balance(entity_type: str) -> None:
     table = "accounts" if entity_type == "account" else "debts"
     if entity_type == "account":
@@ -345,19 +370,11 @@ def update_balance(entity_type: str) -> None:
         print("Not found.")
         return
 
-    old_balance = float(row["balance"])
-    new_balance = prompt_float(f"New balance for {row['name']}", old_balance)
+    new_balance = prompt_float(f"New balance for {row['name']}", to_dollars(row["balance"]))
     note = prompt_text("Note", "")
     update_date = prompt_date("Update date")
 
-    execute(f"UPDATE {table} SET balance = ? WHERE id = ?", (new_balance, entity_id))
-    execute(
-        """
-        INSERT INTO balance_updates(date, entity_type, entity_id, old_balance, new_balance, note)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (update_date, entity_type, entity_id, old_balance, new_balance, note or None),
-    )
+    set_balance(entity_type, entity_id, new_balance, update_date, note)
     print("Balance updated.")
 
 
@@ -424,7 +441,7 @@ def manage_accounts() -> None:
             interest = prompt_text("Interest rate (optional)", "")
             execute(
                 "INSERT INTO accounts(name, institution, type, balance, interest_rate, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-                (name, institution or None, typ, balance, float(interest) if interest else None, date.today().isoformat()),
+                (name, institution or None, typ, to_cents(balance), float(interest) if interest else None, date.today().isoformat()),
             )
         elif choice == "2":
             aid = prompt_int("Account ID")
@@ -461,9 +478,9 @@ def manage_debts() -> None:
                     name,
                     prompt_text("Institution/person", "") or None,
                     prompt_text("Type", "personal"),
-                    prompt_float("Balance"),
+                    to_cents(prompt_float("Balance")),
                     float(prompt_text("Interest rate", "") or 0) or None,
-                    float(prompt_text("Min payment", "") or 0) or None,
+                    to_cents(prompt_text("Min payment", "") or 0) or None,
                     prompt_int("Due day", allow_blank=True),
                     date.today().isoformat(),
                 ),
@@ -481,7 +498,7 @@ def manage_debts() -> None:
                     prompt_text("Institution/person", row["institution"] or "") or None,
                     prompt_text("Type", row["type"]),
                     float(prompt_text("Interest rate", str(row["interest_rate"] or "")) or 0) or None,
-                    float(prompt_text("Min payment", str(row["min_payment"] or "")) or 0) or None,
+                    to_cents(prompt_text("Min payment", str(to_dollars(row["min_payment"]) or "")) or 0) or None,
                     prompt_int("Due day", row["due_day"], allow_blank=True),
                     did,
                 ),
@@ -544,22 +561,22 @@ def goals_menu() -> None:
             update_goal(
                 gid,
                 name=prompt_text("Name", row["name"]),
-                target_amount=prompt_float("Target amount", float(row["target_amount"] or 0.0)),
+                target_amount=prompt_float("Target amount", to_dollars(row["target_amount"] or 0)),
                 target_date=prompt_date("Target date", default_today=False, allow_blank=True) or row["target_date"],
                 contribution_limit=(
-                    prompt_float("Contribution limit", float(row["contribution_limit"] or 0.0))
+                    prompt_float("Contribution limit", to_dollars(row["contribution_limit"] or 0))
                     if row["type"] == "contribution_cap"
-                    else row["contribution_limit"]
+                    else to_dollars(row["contribution_limit"])
                 ),
                 contributed_so_far=(
-                    prompt_float("Contributed so far", float(row["contributed_so_far"] or 0.0))
+                    prompt_float("Contributed so far", to_dollars(row["contributed_so_far"] or 0))
                     if row["type"] == "contribution_cap"
-                    else row["contributed_so_far"]
+                    else to_dollars(row["contributed_so_far"])
                 ),
                 current_amount_override=(
-                    prompt_float("Current amount override", float(row["current_amount_override"] or 0.0))
+                    prompt_float("Current amount override", to_dollars(row["current_amount_override"] or 0))
                     if row["type"] == "custom"
-                    else row["current_amount_override"]
+                    else to_dollars(row["current_amount_override"])
                 ),
             )
             print("Goal updated")
@@ -573,7 +590,25 @@ def goals_menu() -> None:
             return
 
 
-def menu_loop() -> None:
+def report_queries(label: str, stats: QueryStats) -> None:
+    print(f"[sql] {label}: {stats.count} queries, {stats.total_ms:.1f} ms", file=sys.stderr)
+    for ms, sql in stats.slowest[:3]:
+        print(f"[sql]   {ms:8.2f} ms  {sql[:120]}", file=sys.stderr)
+
+
+def run_action(label: str, action: Callable[[], None], metrics: bool = False) -> None:
+    """Run a CLI action, printing its SQL count and timings when ``metrics`` is on."""
+    if not metrics:
+        action()
+        return
+    with collect_queries() as stats:
+        try:
+            action()
+        finally:
+            report_queries(label, stats)
+
+
+def menu_loop(metrics: bool = False) -> None:
     actions: dict[str, tuple[str, Callable[[], None]]] = {
         "1": ("dashboard", print_dashboard),
         "2": ("add-income", add_income_cli),
@@ -587,6 +622,8 @@ def menu_loop() -> None:
         "10": ("manage-subscriptions", manage_subscriptions),
         "11": ("set-expected-income", set_income_cli),
         "12": ("history", lambda: print_history(prompt_int("Last N records", 10) or 10)),
+        "13": ("import-transactions", import_cli),
+        "14": ("trends", lambda: print_trends(prompt_int("Last N months", 6) or 6)),
     }
 
     while True:
@@ -604,6 +641,8 @@ def menu_loop() -> None:
             "10) manage-subscriptions\n"
             "11) set-expected-income\n"
             "12) history\n"
+            "13) import-transactions\n"
+            "14) trends\n"
             "0) exit"
         )
         choice = prompt_text("Select option", "1")
@@ -618,16 +657,48 @@ def menu_loop() -> None:
             continue
 
         try:
-            action[1]()
+            run_action(action[0], action[1], metrics)
         except Exception as exc:  # Keep CLI resilient.
             print(f"Error: {exc}")
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Personal budget CLI.")
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        default=os.environ.get("BUDGET_METRICS") == "1",
+        help="print SQL query counts and timings after each action (or set BUDGET_METRICS=1)",
+    )
+    parser.add_argument(
+        "--ledger",
+        default=os.environ.get("BUDGET_LEDGER") or None,
+        help="use (and create if needed) this household's ledger instead of budget.db (or set BUDGET_LEDGER)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    import_parser = commands.add_parser("import", help="bulk-import a CSV/OFX/QFX bank export")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+    import_parser.add_argument("--category", type=int, help="category id for expenses without one")
+    import_parser.add_argument("--kind", choices=IMPORT_KINDS, help="treat every row as this kind")
+    args = parser.parse_args(argv)
+
+    try:
+        begin_ledger(args.ledger)
+    except ValueError as exc:
+        parser.error(str(exc))
     init_db()
+    if args.command == "import":
+        run_action(
+            "import",
+            lambda: run_import(args.path, fmt=args.format, category_id=args.category, kind=args.kind),
+            args.metrics,
+        )
+        return
+
     if not has_initial_data():
-        setup_wizard()
-    menu_loop()
+        run_action("setup", setup_wizard, args.metrics)
+    menu_loop(args.metrics)
 
 
 if __name__ == "__main__":
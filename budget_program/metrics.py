@@ -0,0 +1,88 @@
+"""In-process per-route request metrics behind ``/api/_metrics``."""
+
+from __future__ import annotations
+
+import threading
+
+from database import SLOW_QUERY_SLOTS, QueryStats
+
+# Histogram upper bounds. Histograms are reported as lists of counts, one per
+# bound plus a final overflow bucket.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+
+def _bucket_index(bounds: tuple, value: float) -> int:
+    for index, bound in enumerate(bounds):
+        if value <= bound:
+            return index
+    return len(bounds)
+
+
+class _RouteMetrics:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.server_errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.latency = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.queries = [0] * (len(QUERY_COUNT_BUCKETS) + 1)
+        self.slowest: list[tuple[float, str]] = []
+
+    def observe(self, duration_ms: float, status: int, stats: QueryStats) -> None:
+        self.requests += 1
+        self.server_errors += status >= 500
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.sql_count += stats.count
+        self.sql_ms += stats.total_ms
+        self.latency[_bucket_index(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.queries[_bucket_index(QUERY_COUNT_BUCKETS, stats.count)] += 1
+        if stats.slowest:
+            merged = {sql: ms for ms, sql in self.slowest}
+            for ms, sql in stats.slowest:
+                merged[sql] = max(ms, merged.get(sql, 0.0))
+            self.slowest = sorted(((ms, sql) for sql, ms in merged.items()), reverse=True)[:SLOW_QUERY_SLOTS]
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "server_errors": self.server_errors,
+            "mean_ms": round(self.total_ms / self.requests, 3),
+            "max_ms": round(self.max_ms, 3),
+            "latency_ms": list(self.latency),
+            "sql": {
+                "queries_per_request": round(self.sql_count / self.requests, 2),
+                "mean_ms": round(self.sql_ms / self.requests, 3),
+                "queries": list(self.queries),
+                "slowest": [{"ms": round(ms, 3), "sql": sql} for ms, sql in self.slowest],
+            },
+        }
+
+
+class MetricsRegistry:
+    """Aggregates request timings and SQL stats per route, thread-safely."""
+
+    def __init__(self) -> None:
+        self._routes: dict[str, _RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, duration_ms: float, status: int, stats: QueryStats) -> None:
+        with self._lock:
+            metrics = self._routes.get(route)
+            if metrics is None:
+                metrics = self._routes[route] = _RouteMetrics()
+            metrics.observe(duration_ms, status, stats)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {route: metrics.as_dict() for route, metrics in sorted(self._routes.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,40 @@
+"""Money conversion between stored integer cents and display dollars.
+
+Every money column holds integer cents and the services do their arithmetic
+on ints, which is exact and needs no rounding. Dollars only exist at the
+edges: parsing user input, and the dicts handed to the API/CLI.
+"""
+
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+
+def to_cents(amount) -> int | None:
+    """Convert a dollar amount (number or numeric string) to integer cents.
+
+    Raises ValueError for anything that is not a finite number.
+    """
+    if amount is None:
+        return None
+    # Going through str() keeps 0.1 + 0.2 style binary noise out of the result.
+    try:
+        cents = (Decimal(str(amount).strip()) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{amount}'.") from None
+    return int(cents)
+
+
+def to_dollars(cents) -> float | None:
+    if cents is None:
+        return None
+    return int(cents) / 100
+
+
+def with_dollars(row, keys: tuple[str, ...]) -> dict:
+    """Copy a row/dict, converting the given cent-valued keys to dollars."""
+    result = dict(row)
+    for key in keys:
+        if key in result:
+            result[key] = to_dollars(result[key])
+    return result
@@ -1,19 +1,108 @@
 """
-Quick start script for the budget web dashboard.
+Start the budget web dashboard.
 
-Run this script to start the web server:
-    python run_web.py
+    python run_web.py                  # development server (debugger, reloader)
+    python run_web.py --production     # multi-worker server for everyday use
 
 Then open http://localhost:5000 in your browser.
+
+``--production`` runs gunicorn with the settings in gunicorn.conf.py:
+``--workers`` processes with ``--threads`` threads each. Where gunicorn is
+not installed (it does not run on Windows) it falls back to a single-process
+threaded server. Neither has the debugger or the reloader, and both close the
+database cleanly on Ctrl+C or SIGTERM.
 """
 
-from web_app import app, init_db
+from __future__ import annotations
 
-if __name__ == "__main__":
-    init_db()
+import argparse
+import os
+import signal
+import sys
+import threading
+from importlib.util import find_spec
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Run the budget web dashboard.")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        default=env("BUDGET_WEB_PRODUCTION") == "1",
+        help="serve with worker processes instead of the development server",
+    )
+    parser.add_argument("--host", default=env("BUDGET_WEB_HOST", "127.0.0.1"), help="use 0.0.0.0 to serve the network")
+    parser.add_argument("--port", type=int, default=int(env("BUDGET_WEB_PORT", "5000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(env("BUDGET_WEB_WORKERS", str(os.cpu_count() or 1))),
+        help="worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=int(env("BUDGET_WEB_THREADS", "8")),
+        help="threads per worker; open dashboards hold up to half of them (default: 8)",
+    )
+    return parser.parse_args(argv)
+
+
+def run_gunicorn(args: argparse.Namespace) -> None:
+    os.environ.update(
+        BUDGET_WEB_BIND=f"{args.host}:{args.port}",
+        BUDGET_WEB_WORKERS=str(args.workers),
+        BUDGET_WEB_THREADS=str(args.threads),
+    )
+    command = [sys.executable, "-m", "gunicorn", "--chdir", str(HERE), "-c", str(HERE / "gunicorn.conf.py"), "wsgi:app"]
+    os.execv(sys.executable, command)
+
+
+def run_threaded(args: argparse.Namespace) -> None:
+    """Single-process fallback: one thread per connection, no debugger."""
+    from werkzeug.serving import make_server
+
+    import database
+    from web_app import app
+
+    server = make_server(args.host, args.port, app, threaded=True)
+
+    def stop(signum, frame) -> None:
+        # shutdown() waits for serve_forever to return, so it cannot run on
+        # the serving thread itself.
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        database.close_all()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     print("\n" + "="*60)
     print("Budget Dashboard is starting...")
     print("="*60)
-    print("\n🌐 Open your browser and go to: http://localhost:5000")
+    print(f"\n🌐 Open your browser and go to: http://localhost:{args.port}")
     print("\nPress Ctrl+C to stop the server\n")
-    app.run(debug=True, port=5000)
+
+    if not args.production:
+        from web_app import app
+
+        app.run(debug=True, host=args.host, port=args.port)
+    elif find_spec("gunicorn"):
+        run_gunicorn(args)
+    else:
+        print("gunicorn is not installed; serving from one threaded process.\n")
+        run_threaded(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
-from datetime import date
+import re
+import sqlite3
 
-from database import execute, fetchall, fetchone
+from database import checkpoint_balances, execute, fetchall, fetchone, sync_expense_tags, transaction
+from money import to_cents, to_dollars
+from services.balances import balance_date, log_balance_update
+from services.pagination import clamp_limit, decode_cursor, page
 
 
 def get_all_categories() -> list[dict]:
@@ -19,6 +23,7 @@ def get_all_categories() -> list[dict]:
 
 
 def add_expense(expense_date: str, amount: float, category_id: int, note: str = "", tags: str = "") -> int:
+    amount = to_cents(amount)
     if amount <= 0:
         raise ValueError("Expense amount must be greater than zero.")
 
@@ -26,10 +31,14 @@ def add_expense(expense_date: str, amount: float, category_id: int, note: str =
     if not category:
         raise ValueError("Category not found.")
 
-    return execute(
-        "INSERT INTO expenses(date, amount, category_id, paid_amount, note, tags) VALUES (?, ?, ?, 0, ?, ?)",
-        (expense_date, amount, category_id, note.strip() or None, tags.strip() or None),
-    )
+    with transaction():
+        expense_id = execute(
+            "INSERT INTO expenses(date, amount, category_id, paid_amount, note, tags) VALUES (?, ?, ?, 0, ?, ?)",
+            (expense_date, amount, category_id, note.strip() or None, tags.strip() or None),
+        )
+        if tags.strip():
+            sync_expense_tags(expense_id, expense_id)
+    return expense_id
 
 
 def update_expense(expense_id: int, category_id: int | None = None, note: str | None = None, tags: str | None = None) -> None:
@@ -41,27 +50,53 @@ def update_expense(expense_id: int, category_id: int | None = None, note: str |
         category = fetchone("SELECT id FROM categories WHERE id = ?", (category_id,))
         if not category:
             raise ValueError("Category not found.")
-        execute("UPDATE expenses SET category_id = ? WHERE id = ?", (category_id, expense_id))
-
-    if note is not None:
-        execute("UPDATE expenses SET note = ? WHERE id = ?", (note.strip() or None, expense_id))
 
-    if tags is not None:
-        execute("UPDATE expenses SET tags = ? WHERE id = ?", (tags.strip() or None, expense_id))
+    with transaction():
+        if category_id is not None:
+            execute("UPDATE expenses SET category_id = ? WHERE id = ?", (category_id, expense_id))
+
+        if note is not None:
+            execute("UPDATE expenses SET note = ? WHERE id = ?", (note.strip() or None, expense_id))
+
+        if tags is not None:
+            execute("UPDATE expenses SET tags = ? WHERE id = ?", (tags.strip() or None, expense_id))
+            sync_expense_tags(expense_id, expense_id)
+
+
+_EXPENSE_COLUMNS = """
+    e.id,
+    e.date,
+    e.amount,
+    e.paid_amount,
+    e.category_id,
+    c.name AS category_name,
+    e.note,
+    e.tags
+"""
+
+
+def _expense_dict(row) -> dict:
+    amount = int(row["amount"])
+    paid_amount = int(row["paid_amount"])
+    remaining = max(amount - paid_amount, 0)
+    return {
+        "id": int(row["id"]),
+        "date": row["date"],
+        "amount": to_dollars(amount),
+        "paid_amount": to_dollars(paid_amount),
+        "remaining": to_dollars(remaining),
+        "is_paid": remaining <= 0,
+        "category_id": int(row["category_id"]),
+        "category_name": row["category_name"],
+        "note": row["note"],
+        "tags": row["tags"],
+    }
 
 
 def list_recent_expenses(limit: int = 20) -> list[dict]:
     rows = fetchall(
-        """
-        SELECT
-            e.id,
-            e.date,
-            e.amount,
-            e.paid_amount,
-            e.category_id,
-            c.name AS category_name,
-            e.note,
-            e.tags
+        f"""
+        SELECT {_EXPENSE_COLUMNS}
         FROM expenses e
         LEFT JOIN categories c ON c.id = e.category_id
         ORDER BY e.date DESC, e.id DESC
@@ -69,28 +104,115 @@ def list_recent_expenses(limit: int = 20) -> list[dict]:
         """,
         (limit,),
     )
-
-    result = []
-    for row in rows:
-        amount = float(row["amount"])
-        paid_amount = float(row["paid_amount"])
-        remaining = round(max(amount - paid_amount, 0.0), 2)
-        result.append(
-            {
-                "id": int(row["id"]),
-                "date": row["date"],
-                "amount": round(amount, 2),
-                "paid_amount": round(paid_amount, 2),
-                "remaining": remaining,
-                "is_paid": remaining <= 0.0,
-                "category_id": int(row["category_id"]),
-                "category_name": row["category_name"],
-                "note": row["note"],
-                "tags": row["tags"],
-            }
+    return [_expense_dict(row) for row in rows]
+
+
+def query_expenses(
+    start_date: str | None = None,
+    end_date: str | None = None,
+    category_id: int | None = None,
+    min_amount: float | None = None,
+    max_amount: float | None = None,
+    state: str | None = None,
+    tag: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> dict:
+    """Filter expenses newest first, one keyset page at a time.
+
+    ``end_date`` is inclusive. ``category_id`` also matches its subcategories.
+    ``state`` is ``paid`` or ``pending``. Pass the returned ``next_cursor`` back
+    as ``cursor`` to get the following page; it is None on the last page.
+    """
+    limit = clamp_limit(limit)
+    clauses = []
+    params: list = []
+
+    if start_date:
+        clauses.append("e.date >= ?")
+        params.append(start_date)
+    if end_date:
+        clauses.append("e.date <= ?")
+        params.append(end_date)
+    if category_id is not None:
+        clauses.append("e.category_id IN (SELECT id FROM categories WHERE id = ? OR parent_id = ?)")
+        params.extend((category_id, category_id))
+    if min_amount is not None:
+        clauses.append("e.amount >= ?")
+        params.append(to_cents(min_amount))
+    if max_amount is not None:
+        clauses.append("e.amount <= ?")
+        params.append(to_cents(max_amount))
+    if state == "paid":
+        clauses.append("e.paid_amount >= e.amount")
+    elif state == "pending":
+        clauses.append("e.amount > e.paid_amount")
+    elif state:
+        raise ValueError("state must be 'paid' or 'pending'.")
+    if tag:
+        clauses.append(
+            "e.id IN (SELECT et.expense_id FROM expense_tags et JOIN tags t ON t.id = et.tag_id WHERE t.name = ?)"
         )
+        params.append(tag.strip().lower())
+    if cursor:
+        clauses.append("(e.date, e.id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
 
-    return result
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = fetchall(
+        f"""
+        SELECT {_EXPENSE_COLUMNS}
+        FROM expenses e
+        LEFT JOIN categories c ON c.id = e.category_id
+        {where}
+        ORDER BY e.date DESC, e.id DESC
+        LIMIT ?
+        """,
+        (*params, limit + 1),
+    )
+    rows, next_cursor = page(rows, limit)
+    return {"items": [_expense_dict(row) for row in rows], "next_cursor": next_cursor}
+
+
+def _match_expression(text: str) -> str:
+    # Each word becomes a quoted prefix term, so user input can never be
+    # parsed as FTS5 syntax and "cost rec" finds "Costco receipt".
+    words = re.findall(r"\w+", text)
+    if not words:
+        raise ValueError("Search query is required.")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_expenses(text: str, cursor: str | None = None, limit: int | None = None) -> dict:
+    """Full-text search over expense notes and tags, best matches first.
+
+    Every word must match (as a prefix). Results are ranked by BM25 and paged
+    like query_expenses; here ``next_cursor`` is an offset into the ranking,
+    which FTS5 computes for all matches anyway.
+    """
+    limit = clamp_limit(limit)
+    if cursor and not cursor.isdigit():
+        raise ValueError("Invalid cursor.")
+    offset = int(cursor or 0)
+    try:
+        rows = fetchall(
+            f"""
+            SELECT {_EXPENSE_COLUMNS}
+            FROM expenses_fts
+            JOIN expenses e ON e.id = expenses_fts.rowid
+            LEFT JOIN categories c ON c.id = e.category_id
+            WHERE expenses_fts MATCH ?
+            ORDER BY expenses_fts.rank, e.id
+            LIMIT ? OFFSET ?
+            """,
+            (_match_expression(text), limit + 1, offset),
+        )
+    except sqlite3.OperationalError as error:
+        if "expenses_fts" not in str(error):
+            raise
+        raise ValueError("Full-text search needs SQLite with FTS5.") from None
+    next_cursor = str(offset + limit) if len(rows) > limit else None
+    return {"items": [_expense_dict(row) for row in rows[:limit]], "next_cursor": next_cursor}
 
 
 def get_pending_expenses(limit: int = 20) -> list[dict]:
@@ -115,17 +237,17 @@ def get_pending_expenses(limit: int = 20) -> list[dict]:
 
     pending = []
     for row in rows:
-        amount = float(row["amount"])
-        paid_amount = float(row["paid_amount"])
+        amount = int(row["amount"])
+        paid_amount = int(row["paid_amount"])
         pending.append(
             {
                 "id": int(row["id"]),
                 "date": row["date"],
                 "category_id": int(row["category_id"]),
                 "category_name": row["category_name"],
-                "amount": round(amount, 2),
-                "paid_amount": round(paid_amount, 2),
-                "remaining": round(amount - paid_amount, 2),
+                "amount": to_dollars(amount),
+                "paid_amount": to_dollars(paid_amount),
+                "remaining": to_dollars(amount - paid_amount),
                 "note": row["note"],
             }
         )
@@ -141,75 +263,100 @@ def allocate_from_account(
     allocation_date: str | None = None,
     note: str = "",
 ) -> int:
+    """Pay an expense or debt out of an account balance.
+
+    Everything runs in one IMMEDIATE transaction, and each balance change is
+    guarded by a ``WHERE`` condition, so two concurrent allocations can never
+    both spend the same money.
+    """
+    amount = to_cents(amount)
     if amount <= 0:
         raise ValueError("Allocation amount must be greater than zero.")
 
-    account = fetchone("SELECT id, name, balance FROM accounts WHERE id = ?", (account_id,))
-    if not account:
-        raise ValueError("Account not found.")
-
-    old_account_balance = float(account["balance"])
-    if amount > old_account_balance:
-        raise ValueError("Insufficient account balance for this allocation.")
-
     target_type = (target_type or "").strip().lower()
     if target_type not in {"expense", "debt"}:
         raise ValueError("target_type must be either 'expense' or 'debt'.")
 
-    if target_type == "expense":
-        expense = fetchone("SELECT id, amount, paid_amount FROM expenses WHERE id = ?", (target_id,))
-        if not expense:
-            raise ValueError("Expense not found.")
-        remaining = round(float(expense["amount"]) - float(expense["paid_amount"]), 2)
-        if remaining <= 0:
-            raise ValueError("Expense is already fully paid.")
-        if amount > remaining:
-            raise ValueError(f"Allocation exceeds expense remaining amount (${remaining:.2f}).")
-
-        execute(
-            "UPDATE expenses SET paid_amount = ROUND(paid_amount + ?, 2) WHERE id = ?",
-            (amount, target_id),
-        )
-    else:
-        debt = fetchone("SELECT id, balance FROM debts WHERE id = ?", (target_id,))
-        if not debt:
-            raise ValueError("Debt not found.")
-        debt_balance = float(debt["balance"])
-        if debt_balance <= 0:
-            raise ValueError("Debt is already paid off.")
-        if amount > debt_balance:
-            raise ValueError(f"Allocation exceeds debt balance (${debt_balance:.2f}).")
-
-        execute(
-            "UPDATE debts SET balance = ROUND(balance - ?, 2) WHERE id = ?",
-            (amount, target_id),
+    allocation_date = balance_date(allocation_date)
+
+    with transaction() as conn:
+        checkpoint_balances()
+        account = fetchone("SELECT id, name, balance FROM accounts WHERE id = ?", (account_id,))
+        if not account:
+            raise ValueError("Account not found.")
+
+        old_account_balance = int(account["balance"])
+        if amount > old_account_balance:
+            raise ValueError("Insufficient account balance for this allocation.")
+
+        if target_type == "expense":
+            expense = fetchone("SELECT id, amount, paid_amount FROM expenses WHERE id = ?", (target_id,))
+            if not expense:
+                raise ValueError("Expense not found.")
+            remaining = int(expense["amount"]) - int(expense["paid_amount"])
+            if remaining <= 0:
+                raise ValueError("Expense is already fully paid.")
+            if amount > remaining:
+                raise ValueError(f"Allocation exceeds expense remaining amount (${to_dollars(remaining):.2f}).")
+
+            updated = conn.execute(
+                """
+                UPDATE expenses SET paid_amount = paid_amount + ?
+                WHERE id = ? AND amount - paid_amount >= ?
+                """,
+                (amount, target_id, amount),
+            ).rowcount
+            if updated != 1:
+                raise ValueError("Expense changed while allocating; please retry.")
+        else:
+            debt = fetchone("SELECT id, balance FROM debts WHERE id = ?", (target_id,))
+            if not debt:
+                raise ValueError("Debt not found.")
+            debt_balance = int(debt["balance"])
+            if debt_balance <= 0:
+                raise ValueError("Debt is already paid off.")
+            if amount > debt_balance:
+                raise ValueError(f"Allocation exceeds debt balance (${to_dollars(debt_balance):.2f}).")
+
+            updated = conn.execute(
+                "UPDATE debts SET balance = balance - ? WHERE id = ? AND balance >= ?",
+                (amount, target_id, amount),
+            ).rowcount
+            if updated != 1:
+                raise ValueError("Debt changed while allocating; please retry.")
+
+        new_account_balance = old_account_balance - amount
+        updated = conn.execute(
+            "UPDATE accounts SET balance = ? WHERE id = ? AND balance >= ?",
+            (new_account_balance, account_id, amount),
+        ).rowcount
+        if updated != 1:
+            raise ValueError("Insufficient account balance for this allocation.")
+
+        allocation_id = execute(
+            """
+            INSERT INTO account_allocations(date, account_id, target_type, target_id, amount, note)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (allocation_date, account_id, target_type, target_id, amount, note.strip() or None),
         )
 
-    new_account_balance = round(old_account_balance - amount, 2)
-    execute("UPDATE accounts SET balance = ? WHERE id = ?", (new_account_balance, account_id))
-
-    allocation_date = allocation_date or date.today().isoformat()
-    allocation_id = execute(
-        """
-        INSERT INTO account_allocations(date, account_id, target_type, target_id, amount, note)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (allocation_date, account_id, target_type, target_id, amount, note.strip() or None),
-    )
-
-    execute(
-        """
-        INSERT INTO balance_updates(date, entity_type, entity_id, old_balance, new_balance, note)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            allocation_date,
+        log_balance_update(
             "account",
             account_id,
             old_account_balance,
             new_account_balance,
-            note.strip() or f"Allocated ${amount:.2f} to {target_type} {target_id}",
-        ),
-    )
+            allocation_date,
+            note.strip() or f"Allocated ${to_dollars(amount):.2f} to {target_type} {target_id}",
+        )
+        if target_type == "debt":
+            log_balance_update(
+                "debt",
+                target_id,
+                debt_balance,
+                debt_balance - amount,
+                allocation_date,
+                note.strip() or f"Paid ${to_dollars(amount):.2f} from account {account_id}",
+            )
 
     return allocation_id
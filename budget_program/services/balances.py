@@ -0,0 +1,224 @@
+"""Account/debt balance changes and net-worth history.
+
+Every balance change is logged to balance_updates with its old and new
+value. A balance on a past date is read from the nearest month-end
+checkpoint on or after that date (or the current balance when there is
+none), with the changes logged in between undone.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from database import checkpoint_balances, execute, fetchall, fetchone, transaction
+from money import to_cents, to_dollars
+
+ENTITY_TABLES = {"account": "accounts", "debt": "debts"}
+HISTORY_INTERVALS = ("day", "week", "month")
+MAX_HISTORY_POINTS = 1000
+
+
+def _parse_day(value: str) -> date:
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}'; use YYYY-MM-DD.") from None
+
+
+def balance_date(value: str | None) -> str:
+    """``value`` as YYYY-MM-DD (today when empty); ValueError if it is not a date.
+
+    Checkpoints and history compare these dates as strings, so anything else
+    would sort into the wrong month.
+    """
+    return _parse_day(value).isoformat() if value else date.today().isoformat()
+
+
+def log_balance_update(
+    entity_type: str,
+    entity_id: int,
+    old_balance: int,
+    new_balance: int,
+    update_date: str,
+    note: str | None = None,
+) -> None:
+    """Log a balance change (cents) made in the caller's transaction."""
+    execute(
+        """
+        INSERT INTO balance_updates(date, entity_type, entity_id, old_balance, new_balance, note)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (balance_date(update_date), entity_type, entity_id, old_balance, new_balance, note),
+    )
+
+
+def set_balance(entity_type: str, entity_id: int, new_balance: float, update_date: str | None = None, note: str = "") -> None:
+    """Set an account or debt balance (dollars) and log the change."""
+    table = ENTITY_TABLES.get(entity_type)
+    if table is None:
+        raise ValueError("entity_type must be either 'account' or 'debt'.")
+    cents = to_cents(new_balance)
+    update_date = balance_date(update_date)
+    with transaction():
+        # Before the balance moves, so the checkpoints see a logged state.
+        checkpoint_balances()
+        row = fetchone(f"SELECT balance FROM {table} WHERE id = ?", (entity_id,))
+        if not row:
+            raise ValueError(f"{entity_type.title()} not found.")
+        execute(f"UPDATE {table} SET balance = ? WHERE id = ?", (cents, entity_id))
+        log_balance_update(
+            entity_type,
+            entity_id,
+            int(row["balance"]),
+            cents,
+            update_date,
+            note.strip() or None,
+        )
+
+
+# --- History -----------------------------------------------------------------
+
+def _entities() -> list:
+    return fetchall(
+        """
+        SELECT 'account' AS entity_type, id, name, type, balance, created_at FROM accounts
+        UNION ALL
+        SELECT 'debt', id, name, type, balance, created_at FROM debts
+        ORDER BY 1, 2
+        """
+    )
+
+
+def _balances_on(day: str, entities: list) -> dict[tuple[str, int], int]:
+    """Closing balance on ``day`` for every entity that existed then, in cents."""
+    created = {(e["entity_type"], e["id"]): e["created_at"][:10] for e in entities}
+    checkpoint = fetchone("SELECT MIN(date) AS date FROM balance_snapshots WHERE date >= ?", (day,))["date"]
+    if checkpoint:
+        balances = {
+            (r["entity_type"], r["entity_id"]): int(r["balance"])
+            for r in fetchall("SELECT entity_type, entity_id, balance FROM balance_snapshots WHERE date = ?", (checkpoint,))
+        }
+        window, params = "date > ? AND date <= ?", (day, checkpoint)
+    else:
+        balances = {(e["entity_type"], e["id"]): int(e["balance"]) for e in entities}
+        window, params = "date > ?", (day,)
+    changes = fetchall(
+        f"""
+        SELECT entity_type, entity_id, SUM(new_balance - old_balance) AS delta
+        FROM balance_updates WHERE {window}
+        GROUP BY entity_type, entity_id
+        """,
+        params,
+    )
+    for r in changes:
+        key = (r["entity_type"], r["entity_id"])
+        if key in balances:
+            balances[key] -= int(r["delta"])
+    return {key: balance for key, balance in balances.items() if key in created and created[key] <= day}
+
+
+def _totals(balances: dict[tuple[str, int], int]) -> dict:
+    assets = sum(balance for (entity_type, _), balance in balances.items() if entity_type == "account")
+    liabilities = sum(balance for (entity_type, _), balance in balances.items() if entity_type == "debt")
+    return {
+        "assets": to_dollars(assets),
+        "liabilities": to_dollars(liabilities),
+        "net_worth": to_dollars(assets - liabilities),
+    }
+
+
+def balances_on(day: str | None = None) -> dict:
+    """Every account and debt balance, plus net worth, at the end of ``day``."""
+    day = _parse_day(day or date.today().isoformat()).isoformat()
+    entities = _entities()
+    balances = _balances_on(day, entities)
+    result = {"date": day, "accounts": [], "debts": []}
+    for e in entities:
+        key = (e["entity_type"], e["id"])
+        if key in balances:
+            result[ENTITY_TABLES[e["entity_type"]]].append(
+                {"id": e["id"], "name": e["name"], "type": e["type"], "balance": to_dollars(balances[key])}
+            )
+    result.update(_totals(balances))
+    return result
+
+
+def _history_points(start: date, end: date, interval: str) -> list[str]:
+    if interval == "month":
+        points = []
+        month = start.replace(day=1)
+        while True:
+            month = (month + timedelta(days=32)).replace(day=1)
+            month_end = month - timedelta(days=1)
+            if month_end >= end:
+                break
+            points.append(month_end)
+        points.append(end)
+    else:
+        step = timedelta(days=1 if interval == "day" else 7)
+        points = []
+        day = end
+        while day >= start:
+            points.append(day)
+            day -= step
+        points.reverse()
+    if len(points) > MAX_HISTORY_POINTS:
+        raise ValueError(f"At most {MAX_HISTORY_POINTS} points per request; use a longer interval.")
+    return [p.isoformat() for p in points]
+
+
+def balance_history(start: str | None = None, end: str | None = None, interval: str = "month") -> dict:
+    """Per-entity balances, assets, liabilities and net worth over a date range.
+
+    Chart-ready parallel arrays aligned with ``dates``: the end of each day,
+    week (counting back from ``end``) or month in ``start``..``end``, with
+    ``end`` always last. Entities that did not exist yet have null balances.
+    Defaults to the last year by month. Balances on ``end`` come from
+    balances_on; earlier points undo the range's changes newest first, so
+    the whole range is two reads of balance_updates.
+    """
+    if interval not in HISTORY_INTERVALS:
+        raise ValueError(f"interval must be one of {', '.join(HISTORY_INTERVALS)}.")
+    end_day = _parse_day(end or date.today().isoformat())
+    start_day = _parse_day(start) if start else end_day - timedelta(days=364)
+    if start_day > end_day:
+        raise ValueError("start must not be after end.")
+    points = _history_points(start_day, end_day, interval)
+
+    entities = _entities()
+    created = {(e["entity_type"], e["id"]): e["created_at"][:10] for e in entities}
+    balances = _balances_on(points[-1], entities)
+    changes = fetchall(
+        """
+        SELECT date, entity_type, entity_id, new_balance - old_balance AS delta
+        FROM balance_updates WHERE date > ? AND date <= ?
+        ORDER BY date DESC
+        """,
+        (points[0], points[-1]),
+    )
+
+    series = {key: [None] * len(points) for key in balances}
+    totals = {"assets": [], "liabilities": [], "net_worth": []}
+    position = 0
+    for index in range(len(points) - 1, -1, -1):
+        day = points[index]
+        while position < len(changes) and changes[position]["date"] > day:
+            key = (changes[position]["entity_type"], changes[position]["entity_id"])
+            if key in balances:
+                balances[key] -= int(changes[position]["delta"])
+            position += 1
+        present = {key: balance for key, balance in balances.items() if created[key] <= day}
+        for key, balance in present.items():
+            series[key][index] = to_dollars(balance)
+        for name, value in _totals(present).items():
+            totals[name].append(value)
+
+    result = {"interval": interval, "dates": points, "accounts": [], "debts": []}
+    for e in entities:
+        key = (e["entity_type"], e["id"])
+        if key in series:
+            result[ENTITY_TABLES[e["entity_type"]]].append(
+                {"id": e["id"], "name": e["name"], "type": e["type"], "balance": series[key]}
+            )
+    result.update({name: values[::-1] for name, values in totals.items()})
+    return result
@@ -5,14 +5,21 @@ subscriptions minus planned goal savings leaves the *spendable* amount, which is
 then split across flexible categories by their allocation percentage. Everything
 is normalized to a monthly basis so cadences (weekly pay, yearly subscriptions,
 etc.) can be compared on equal footing.
+
+All arithmetic is on integer cents; functions returning rows for display
+(get_income_profile, list_recurring, compute_budget_plan, ...) convert to
+dollars as the last step.
 """
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import date
 
-from database import execute, fetchall, fetchone
-from services.goals import get_goal_progress
+from database import execute, executemany, fetchall, fetchone
+from money import to_cents, to_dollars, with_dollars
+from services.goals import goal_progress_cents
+from services.pagination import clamp_limit, decode_cursor, page
 
 # How many of each cadence occur in a month, used to normalize any recurring
 # amount to a monthly figure.
@@ -27,31 +34,80 @@ MONTHLY_FACTORS = {
 
 INCOME_CADENCES = ("weekly", "biweekly", "semimonthly", "monthly")
 RECURRING_CADENCES = ("weekly", "biweekly", "monthly", "quarterly", "yearly")
+# Upper bound on compute_budget_plans ranges (ten years).
+MAX_PLAN_MONTHS = 120
 
 
-def to_monthly(amount: float, cadence: str) -> float:
-    """Convert an amount that recurs on the given cadence into a monthly amount."""
-    return float(amount) * MONTHLY_FACTORS.get(cadence, 1.0)
+def to_monthly(cents: int, cadence: str) -> int:
+    """Convert a cent amount that recurs on the given cadence into monthly cents."""
+    return round(cents * MONTHLY_FACTORS.get(cadence, 1.0))
 
 
 def _current_month() -> str:
     return date.today().strftime("%Y-%m")
 
 
+def normalize_month(month: str) -> str:
+    """Validate a ``YYYY-MM`` month and return it zero-padded."""
+    try:
+        year, mon = (int(part) for part in str(month).split("-"))
+        return date(year, mon, 1).strftime("%Y-%m")
+    except ValueError:
+        raise ValueError(f"Invalid month '{month}'; use YYYY-MM.") from None
+
+
+def months_between(start: str, end: str) -> list[str]:
+    """Every ``YYYY-MM`` from ``start`` through ``end`` inclusive."""
+    year, mon = (int(part) for part in normalize_month(start).split("-"))
+    end = normalize_month(end)
+    months = []
+    while (current := f"{year:04d}-{mon:02d}") <= end:
+        months.append(current)
+        year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return months
+
+
+def add_months(month: str, delta: int) -> str:
+    """Shift a ``YYYY-MM`` month by ``delta`` months (negative goes back)."""
+    year, mon = (int(part) for part in normalize_month(month).split("-"))
+    index = year * 12 + (mon - 1) + delta
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def month_bounds(month: str) -> tuple[str, str]:
+    """Return the [first day, first day of next month) date range for ``YYYY-MM``.
+
+    Filtering ``date >= start AND date < end`` lets SQLite seek the date
+    indexes, where ``substr(date, 1, 7) = ?`` would scan every row.
+    """
+    year, mon = (int(part) for part in month.split("-"))
+    start = date(year, mon, 1)
+    end = date(year + 1, 1, 1) if mon == 12 else date(year, mon + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
 # --- Income profile (expected, optional) ------------------------------------
 
-def get_income_profile() -> dict | None:
+def income_profile_cents() -> dict | None:
     row = fetchone("SELECT expected_amount, cadence, updated_at FROM income_profile WHERE id = 1")
     if not row or row["expected_amount"] is None:
         return None
     return {
-        "expected_amount": float(row["expected_amount"]),
+        "expected_amount": int(row["expected_amount"]),
         "cadence": row["cadence"],
-        "monthly": round(to_monthly(float(row["expected_amount"]), row["cadence"]), 2),
+        "monthly": to_monthly(int(row["expected_amount"]), row["cadence"]),
         "updated_at": row["updated_at"],
     }
 
 
+def present_income_profile(profile: dict | None) -> dict | None:
+    return with_dollars(profile, ("expected_amount", "monthly")) if profile else None
+
+
+def get_income_profile() -> dict | None:
+    return present_income_profile(income_profile_cents())
+
+
 def set_income_profile(expected_amount: float | None, cadence: str) -> None:
     if expected_amount is not None:
         if cadence not in INCOME_CADENCES:
@@ -67,7 +123,7 @@ def set_income_profile(expected_amount: float | None, cadence: str) -> None:
             cadence = excluded.cadence,
             updated_at = excluded.updated_at
         """,
-        (expected_amount, cadence, date.today().isoformat()),
+        (to_cents(expected_amount), cadence, date.today().isoformat()),
     )
 
 
@@ -79,63 +135,145 @@ def expected_monthly_income() -> float | None:
 # --- Actual income log (ad-hoc) ---------------------------------------------
 
 def add_income(amount: float, income_date: str | None = None, source: str = "", note: str = "") -> int:
-    if amount <= 0:
+    cents = to_cents(amount)
+    if cents <= 0:
         raise ValueError("Income amount must be greater than zero.")
     income_date = income_date or date.today().isoformat()
     return execute(
         "INSERT INTO income_entries(date, amount, source, note) VALUES (?, ?, ?, ?)",
-        (income_date, float(amount), source.strip() or None, note.strip() or None),
+        (income_date, cents, source.strip() or None, note.strip() or None),
     )
 
 
+def _income_dict(row) -> dict:
+    return {
+        "id": int(row["id"]),
+        "date": row["date"],
+        "amount": to_dollars(row["amount"]),
+        "source": row["source"],
+        "note": row["note"],
+    }
+
+
 def list_recent_income(limit: int = 20) -> list[dict]:
     rows = fetchall(
         "SELECT id, date, amount, source, note FROM income_entries ORDER BY date DESC, id DESC LIMIT ?",
         (limit,),
     )
-    return [
-        {
-            "id": int(r["id"]),
-            "date": r["date"],
-            "amount": round(float(r["amount"]), 2),
-            "source": r["source"],
-            "note": r["note"],
-        }
-        for r in rows
-    ]
+    return [_income_dict(r) for r in rows]
+
+
+def query_income(
+    start_date: str | None = None,
+    end_date: str | None = None,
+    min_amount: float | None = None,
+    max_amount: float | None = None,
+    source: str | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+) -> dict:
+    """Filter income entries newest first, one keyset page at a time (see query_expenses)."""
+    limit = clamp_limit(limit)
+    clauses = []
+    params: list = []
+
+    if start_date:
+        clauses.append("date >= ?")
+        params.append(start_date)
+    if end_date:
+        clauses.append("date <= ?")
+        params.append(end_date)
+    if min_amount is not None:
+        clauses.append("amount >= ?")
+        params.append(to_cents(min_amount))
+    if max_amount is not None:
+        clauses.append("amount <= ?")
+        params.append(to_cents(max_amount))
+    if source:
+        clauses.append("source = ? COLLATE NOCASE")
+        params.append(source.strip())
+    if cursor:
+        clauses.append("(date, id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = fetchall(
+        f"""
+        SELECT id, date, amount, source, note
+        FROM income_entries
+        {where}
+        ORDER BY date DESC, id DESC
+        LIMIT ?
+        """,
+        (*params, limit + 1),
+    )
+    rows, next_cursor = page(rows, limit)
+    return {"items": [_income_dict(r) for r in rows], "next_cursor": next_cursor}
 
 
-def income_received_this_month() -> float:
+def income_received_in(month: str) -> int:
+    """Income logged in ``month`` (``YYYY-MM``), in cents."""
     row = fetchone(
-        "SELECT COALESCE(SUM(amount), 0) AS total FROM income_entries WHERE substr(date, 1, 7) = ?",
-        (_current_month(),),
+        "SELECT COALESCE(SUM(amount), 0) AS total FROM income_entries WHERE date >= ? AND date < ?",
+        month_bounds(month),
     )
-    return round(float(row["total"]) if row else 0.0, 2)
+    return int(row["total"]) if row else 0
+
+
+def income_received_this_month() -> int:
+    """Income logged so far this month, in cents."""
+    return income_received_in(_current_month())
+
+
+def income_by_month(start: str, end: str) -> dict[str, int]:
+    """Income per month for ``start``..``end`` inclusive, in one grouped query."""
+    first, _ = month_bounds(start)
+    _, after = month_bounds(end)
+    rows = fetchall(
+        """
+        SELECT substr(date, 1, 7) AS month, SUM(amount) AS total
+        FROM income_entries
+        WHERE date >= ? AND date < ?
+        GROUP BY month
+        """,
+        (first, after),
+    )
+    return {r["month"]: int(r["total"]) for r in rows}
 
 
 # --- Recurring subscriptions -------------------------------------------------
 
-def add_recurring(name: str, amount: float, cadence: str, category_id: int | None = None, due_day: int | None = None) -> int:
+_INSERT_RECURRING = """
+    INSERT INTO recurring_expenses(name, amount, cadence, category_id, due_day, active, created_at)
+    VALUES (?, ?, ?, ?, ?, 1, ?)
+"""
+
+
+def _recurring_params(name: str, amount: float, cadence: str, category_id: int | None = None, due_day: int | None = None) -> tuple:
     if not name.strip():
         raise ValueError("Subscription name is required.")
-    if amount <= 0:
+    cents = to_cents(amount)
+    if cents <= 0:
         raise ValueError("Subscription amount must be greater than zero.")
     if cadence not in RECURRING_CADENCES:
         raise ValueError(f"Cadence must be one of {', '.join(RECURRING_CADENCES)}.")
-    return execute(
-        """
-        INSERT INTO recurring_expenses(name, amount, cadence, category_id, due_day, active, created_at)
-        VALUES (?, ?, ?, ?, ?, 1, ?)
-        """,
-        (name.strip(), float(amount), cadence, category_id, due_day, date.today().isoformat()),
-    )
+    return (name.strip(), cents, cadence, category_id, due_day, date.today().isoformat())
+
+
+def add_recurring(name: str, amount: float, cadence: str, category_id: int | None = None, due_day: int | None = None) -> int:
+    return execute(_INSERT_RECURRING, _recurring_params(name, amount, cadence, category_id, due_day))
+
+
+def add_recurring_many(subscriptions: list[dict]) -> None:
+    """Validate and insert many subscriptions with one executemany call."""
+    executemany(_INSERT_RECURRING, [_recurring_params(**sub) for sub in subscriptions])
 
 
 def delete_recurring(recurring_id: int) -> None:
     execute("DELETE FROM recurring_expenses WHERE id = ?", (recurring_id,))
 
 
-def list_recurring(active_only: bool = True) -> list[dict]:
+def recurring_cents(active_only: bool = True) -> list[dict]:
     query = """
         SELECT r.id, r.name, r.amount, r.cadence, r.category_id, r.due_day, r.active,
                c.name AS category_name
@@ -150,9 +288,9 @@ def list_recurring(active_only: bool = True) -> list[dict]:
         {
             "id": int(r["id"]),
             "name": r["name"],
-            "amount": round(float(r["amount"]), 2),
+            "amount": int(r["amount"]),
             "cadence": r["cadence"],
-            "monthly": round(to_monthly(float(r["amount"]), r["cadence"]), 2),
+            "monthly": to_monthly(int(r["amount"]), r["cadence"]),
             "category_id": r["category_id"],
             "category_name": r["category_name"],
             "due_day": r["due_day"],
@@ -162,45 +300,63 @@ def list_recurring(active_only: bool = True) -> list[dict]:
     ]
 
 
-def monthly_subscriptions_total() -> float:
-    return round(sum(r["monthly"] for r in list_recurring(active_only=True)), 2)
+def present_recurring(recurring: list[dict]) -> list[dict]:
+    return [with_dollars(r, ("amount", "monthly")) for r in recurring]
+
+
+def list_recurring(active_only: bool = True) -> list[dict]:
+    return present_recurring(recurring_cents(active_only))
+
+
+def monthly_subscriptions_total(recurring: list[dict] | None = None) -> int:
+    """Monthly cost of active subscriptions in cents (``recurring`` from recurring_cents)."""
+    if recurring is None:
+        recurring = recurring_cents(active_only=True)
+    return sum(r["monthly"] for r in recurring)
 
 
 # --- Goal savings ------------------------------------------------------------
 
-def goal_monthly_contributions() -> list[dict]:
-    """Required monthly savings for each active, deadline-bound goal."""
+def goal_monthly_contributions(goals: list[dict] | None = None) -> list[dict]:
+    """Required monthly savings, in cents, for each active, deadline-bound goal.
+
+    Pass ``goals`` (from goal_progress_cents) to reuse progress already loaded.
+    """
+    if goals is None:
+        goals = goal_progress_cents()
     contributions = []
-    for goal in get_goal_progress():
+    for goal in goals:
         if goal["status"] != "ACTIVE":
             continue
         days = goal["days_remaining"]
-        remaining = float(goal["remaining"] or 0.0)
+        remaining = int(goal["remaining"] or 0)
         if remaining <= 0:
             continue
         if days is None:
             # No deadline -> contributing is discretionary, not a fixed reserve.
-            monthly = 0.0
+            monthly = 0
         elif days <= 0:
             monthly = remaining  # Past due: needs the whole remaining now.
         else:
             months = max(days / 30.44, 1.0)
-            monthly = remaining / months
+            monthly = round(remaining / months)
         contributions.append(
             {
                 "id": goal["id"],
                 "name": goal["name"],
                 "type": goal["type"],
-                "remaining": round(remaining, 2),
-                "monthly": round(monthly, 2),
+                "remaining": remaining,
+                "monthly": monthly,
                 "days_remaining": days,
             }
         )
     return contributions
 
 
-def monthly_goal_savings_total() -> float:
-    return round(sum(g["monthly"] for g in goal_monthly_contributions()), 2)
+def monthly_goal_savings_total(contributions: list[dict] | None = None) -> int:
+    if contributions is None:
+        contributions = goal_monthly_contributions()
+    return sum(g["monthly"] for g in contributions)
 
 
 # --- Flexible categories -----------------------------------------------------
@@ -211,17 +367,24 @@ def _top_level_categories() -> list:
     )
 
 
-def _spent_this_month_by_category() -> dict[int, float]:
+def _spent_by_category(month: str) -> dict[int, int]:
     rows = fetchall(
-        """
-        SELECT category_id, COALESCE(SUM(amount), 0) AS spent
-        FROM expenses
-        WHERE substr(date, 1, 7) = ?
-        GROUP BY category_id
-        """,
-        (_current_month(),),
+        "SELECT category_id, spent FROM category_month_totals WHERE month = ?",
+        (month,),
     )
-    return {int(r["category_id"]): float(r["spent"]) for r in rows}
+    return {int(r["category_id"]): int(r["spent"]) for r in rows}
+
+
+def _spent_by_month(start: str, end: str) -> dict[str, dict[int, int]]:
+    """Per-category spend for every month in ``start``..``end``, in one query."""
+    rows = fetchall(
+        "SELECT month, category_id, spent FROM category_month_totals WHERE month >= ? AND month <= ?",
+        (start, end),
+    )
+    spent: dict[str, dict[int, int]] = {}
+    for r in rows:
+        spent.setdefault(r["month"], {})[int(r["category_id"])] = int(r["spent"])
+    return spent
 
 
 def allocation_total() -> float:
@@ -231,17 +394,65 @@ def allocation_total() -> float:
     return round(float(row["total"]) if row else 0.0, 2)
 
 
-def allocation_total_is_valid() -> tuple[bool, float]:
-    total = allocation_total()
+def allocation_total_is_valid(total: float | None = None) -> tuple[bool, float]:
+    if total is None:
+        total = allocation_total()
     return abs(total - 100.0) <= 0.01, total
 
 
 # --- The full plan -----------------------------------------------------------
 
-def compute_budget_plan() -> dict:
-    """Build the monthly budget: income, reserves, spendable, and per-category plan."""
-    expected = expected_monthly_income()
-    received_mtd = income_received_this_month()
+@dataclass
+class PlanSnapshot:
+    """Every input the monthly plan needs, each loaded with exactly one query.
+
+    Build one with ``PlanSnapshot.load()`` and hand it to compute_budget_plan
+    (and anything else rendering the same page) so goals, subscriptions,
+    categories and spend are not re-queried per figure. Money is in cents;
+    use present_goal / present_income_profile for display.
+
+    Income received and category spend are for ``month``. Expected income,
+    subscriptions, goals and category percentages have no history, so plans
+    for past months use their current values.
+    """
+
+    month: str
+    income_profile: dict | None
+    income_received: int
+    recurring: list[dict]
+    goals: list[dict]
+    categories: list
+    spent_by_category: dict[int, int]
+
+    @classmethod
+    def load(cls, goals: list[dict] | None = None, month: str | None = None) -> PlanSnapshot:
+        """Load a snapshot for ``month`` (default: this month).
+
+        ``goals`` (goal_progress_cents rows) is reused if already loaded.
+        """
+        month = normalize_month(month) if month else _current_month()
+        return cls(
+            month=month,
+            income_profile=income_profile_cents(),
+            income_received=income_received_in(month),
+            recurring=recurring_cents(active_only=True),
+            goals=goals if goals is not None else goal_progress_cents(),
+            categories=_top_level_categories(),
+            spent_by_category=_spent_by_category(month),
+        )
+
+
+def compute_budget_plan(snapshot: PlanSnapshot | None = None, month: str | None = None) -> dict:
+    """Build the monthly budget: income, reserves, spendable, and per-category plan.
+
+    Plans ``month`` (``YYYY-MM``, default: this month) unless a preloaded
+    ``snapshot`` is given.
+    """
+    if snapshot is None:
+        snapshot = PlanSnapshot.load(month=month)
+
+    expected = snapshot.income_profile["monthly"] if snapshot.income_profile else None
+    received_mtd = snapshot.income_received
 
     if expected is not None:
         monthly_income = expected
@@ -250,26 +461,27 @@ def compute_budget_plan() -> dict:
         monthly_income = received_mtd
         income_basis = "actual_mtd"
 
-    subscriptions_total = monthly_subscriptions_total()
-    goals_total = monthly_goal_savings_total()
-    reserved = round(subscriptions_total + goals_total, 2)
-    spendable = round(monthly_income - reserved, 2)
-    spendable_for_split = max(spendable, 0.0)
+    goal_contributions = goal_monthly_contributions(snapshot.goals)
+    subscriptions_total = monthly_subscriptions_total(snapshot.recurring)
+    goals_total = monthly_goal_savings_total(goal_contributions)
+    reserved = subscriptions_total + goals_total
+    spendable = monthly_income - reserved
+    spendable_for_split = max(spendable, 0)
 
-    spent_map = _spent_this_month_by_category()
+    spent_map = snapshot.spent_by_category
     categories = []
-    for cat in _top_level_categories():
+    for cat in snapshot.categories:
         pct = float(cat["allocation_pct"])
-        planned = round(spendable_for_split * pct / 100.0, 2)
-        spent = round(spent_map.get(int(cat["id"]), 0.0), 2)
+        planned = round(spendable_for_split * pct / 100.0)
+        spent = spent_map.get(int(cat["id"]), 0)
         categories.append(
             {
                 "id": int(cat["id"]),
                 "name": cat["name"],
                 "allocation_pct": round(pct, 2),
-                "planned": planned,
-                "spent": spent,
-                "remaining": round(planned - spent, 2),
+                "planned": to_dollars(planned),
+                "spent": to_dollars(spent),
+                "remaining": to_dollars(planned - spent),
                 "overspent": spent > planned,
             }
         )
@@ -277,28 +489,65 @@ def compute_budget_plan() -> dict:
     warnings = []
     if spendable < 0:
         warnings.append(
-            f"Fixed commitments (${reserved:,.2f}/mo) exceed income "
-            f"(${monthly_income:,.2f}/mo) by ${abs(spendable):,.2f}."
+            f"Fixed commitments (${to_dollars(reserved):,.2f}/mo) exceed income "
+            f"(${to_dollars(monthly_income):,.2f}/mo) by ${to_dollars(abs(spendable)):,.2f}."
         )
-    valid_alloc, alloc_total = allocation_total_is_valid()
+    valid_alloc, alloc_total = allocation_total_is_valid(
+        round(sum(float(cat["allocation_pct"]) for cat in snapshot.categories), 2)
+    )
     if categories and not valid_alloc:
         warnings.append(f"Category percentages total {alloc_total:.1f}%, not 100%.")
     if income_basis == "actual_mtd":
-        warnings.append(
-            "No expected income set; budget is based on money received so far this month."
-        )
+        so_far = "so far this month" if snapshot.month == _current_month() else f"in {snapshot.month}"
+        warnings.append(f"No expected income set; budget is based on money received {so_far}.")
 
     return {
+        "month": snapshot.month,
         "income_basis": income_basis,
-        "monthly_income": round(monthly_income, 2),
-        "expected_monthly_income": expected,
-        "income_received_mtd": received_mtd,
-        "subscriptions_total": subscriptions_total,
-        "goals_total": goals_total,
-        "reserved": reserved,
-        "spendable": spendable,
+        "monthly_income": to_dollars(monthly_income),
+        "expected_monthly_income": to_dollars(expected),
+        "income_received_mtd": to_dollars(received_mtd),
+        "subscriptions_total": to_dollars(subscriptions_total),
+        "goals_total": to_dollars(goals_total),
+        "reserved": to_dollars(reserved),
+        "spendable": to_dollars(spendable),
         "categories": categories,
-        "subscriptions": list_recurring(active_only=True),
-        "goal_contributions": goal_monthly_contributions(),
+        "subscriptions": present_recurring(snapshot.recurring),
+        "goal_contributions": [with_dollars(g, ("remaining", "monthly")) for g in goal_contributions],
         "warnings": warnings,
     }
+
+
+def compute_budget_plans(start: str, end: str) -> list[dict]:
+    """Plans for every month from ``start`` through ``end`` (``YYYY-MM``, inclusive).
+
+    The configuration is loaded once, and income and category spend for the
+    whole range come from one grouped query each. A multi-year history costs
+    about the same as a single month.
+    """
+    months = months_between(start, end)
+    if not months:
+        raise ValueError("start month must not be after end month.")
+    if len(months) > MAX_PLAN_MONTHS:
+        raise ValueError(f"At most {MAX_PLAN_MONTHS} months can be planned at once.")
+
+    profile = income_profile_cents()
+    recurring = recurring_cents(active_only=True)
+    goals = goal_progress_cents()
+    categories = _top_level_categories()
+    income = income_by_month(months[0], months[-1])
+    spent = _spent_by_month(months[0], months[-1])
+    return [
+        compute_budget_plan(
+            PlanSnapshot(
+                month=month,
+                income_profile=profile,
+                income_received=income.get(month, 0),
+                recurring=recurring,
+                goals=goals,
+                categories=categories,
+                spent_by_category=spent.get(month, {}),
+            )
+        )
+        for month in months
+    ]
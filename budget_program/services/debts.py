@@ -0,0 +1,136 @@
+"""Debt payoff simulation: avalanche, snowball and custom orderings.
+
+Every debt is amortized month by month with its APR and minimum payment.
+The monthly budget is the sum of all minimums plus an extra amount, so a
+paid-off debt's minimum rolls over to the next one in the strategy's order.
+All strategies and extra amounts run together as rows of NumPy arrays, one
+loop iteration per month. NumPy is imported on first use.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from database import fetchall
+from money import to_cents, to_dollars
+from services.budget import add_months
+from services.numeric import require_numpy
+
+MAX_PAYOFF_MONTHS = 600
+MAX_SCENARIOS = 1000
+
+
+def _strategy_orders(debts: list, order: list[int] | None) -> dict[str, list[int]]:
+    """Strategy name -> debt positions, first to be paid off first."""
+    positions = range(len(debts))
+    # Avalanche: highest rate first. Snowball: smallest balance first.
+    avalanche = sorted(positions, key=lambda i: (-float(debts[i]["interest_rate"] or 0), int(debts[i]["balance"])))
+    orders = {
+        "avalanche": avalanche,
+        "snowball": sorted(positions, key=lambda i: (int(debts[i]["balance"]), -float(debts[i]["interest_rate"] or 0))),
+    }
+    if order:
+        index = {int(d["id"]): i for i, d in enumerate(debts)}
+        unknown = [debt_id for debt_id in order if debt_id not in index]
+        if unknown:
+            raise ValueError(f"Unknown or paid-off debt ids in order: {', '.join(map(str, unknown))}")
+        first = list(dict.fromkeys(index[debt_id] for debt_id in order))
+        # Debts left out of the custom order follow it in avalanche order.
+        orders["custom"] = first + [i for i in avalanche if i not in first]
+    return orders
+
+
+def simulate_payoff(extra_payments: list[float] | None = None, order: list[int] | None = None) -> dict:
+    """Payoff schedule per strategy for each extra monthly payment (dollars).
+
+    Results are parallel arrays aligned with ``extra``: months until debt
+    free, the debt-free month, total interest, and each debt's payoff month.
+    A null month (and null interest) means the budget never gets there
+    within MAX_PAYOFF_MONTHS, e.g. when payments are below the interest.
+    ``custom`` runs when ``order`` (debt ids) is given.
+    """
+    np = require_numpy("Debt payoff simulation")
+    extras = [to_cents(amount) for amount in (extra_payments if extra_payments else [0])]
+    if any(cents < 0 for cents in extras):
+        raise ValueError("Extra payments cannot be negative.")
+
+    debts = fetchall("SELECT id, name, balance, interest_rate, min_payment FROM debts WHERE balance > 0 ORDER BY id")
+    orders = _strategy_orders(debts, order)
+    if len(extras) * len(orders) > MAX_SCENARIOS:
+        raise ValueError(f"At most {MAX_SCENARIOS // len(orders)} extra payment amounts per request.")
+
+    minimums = np.array([int(d["min_payment"] or 0) for d in debts], dtype=np.float64)
+    result = {
+        "debts": [
+            {
+                "id": int(d["id"]),
+                "name": d["name"],
+                "balance": to_dollars(d["balance"]),
+                "interest_rate": d["interest_rate"],
+                "min_payment": to_dollars(d["min_payment"]),
+            }
+            for d in debts
+        ],
+        "minimum_payments": to_dollars(int(minimums.sum())),
+        "extra": [to_dollars(cents) for cents in extras],
+        "strategies": {},
+    }
+    if not debts:
+        return result
+
+    # One row per (strategy, extra) scenario; columns are debts in the
+    # row's payoff order, so the extra money always flows left to right.
+    names = list(orders)
+    row_orders = np.repeat(np.array([orders[name] for name in names]), len(extras), axis=0)
+    rows = len(row_orders)
+    balance = np.array([int(d["balance"]) for d in debts], dtype=np.float64)[row_orders]
+    rate = (np.array([float(d["interest_rate"] or 0) for d in debts]) / 1200.0)[row_orders]
+    minimum = minimums[row_orders]
+    budget = minimums.sum() + np.tile(np.array(extras, dtype=np.float64), len(names))
+
+    interest_paid = np.zeros(rows)
+    paid_off = np.zeros((rows, len(debts)), dtype=np.int64)  # month number, 0 = not yet
+    for month in range(1, MAX_PAYOFF_MONTHS + 1):
+        active = balance > 0
+        if not active.any():
+            break
+        interest = np.round(balance * rate)
+        interest_paid += interest.sum(axis=1)
+        balance += interest
+        # Minimums first, then whatever is left pays down debts in order.
+        payment = np.minimum(minimum, balance)
+        left = budget - payment.sum(axis=1)
+        owed_after = balance - payment
+        owed_before = np.cumsum(owed_after, axis=1) - owed_after
+        payment += np.clip(left[:, None] - owed_before, 0.0, owed_after)
+        balance -= payment
+        paid_off[active & (balance <= 0)] = month
+        balance[balance < 0] = 0.0
+
+    today = date.today().strftime("%Y-%m")
+
+    def month_label(months: int) -> str | None:
+        return add_months(today, int(months)) if months else None
+
+    # Back to the debts' own order for the per-debt arrays.
+    by_debt = np.empty_like(paid_off)
+    np.put_along_axis(by_debt, row_orders, paid_off, axis=1)
+    done = (by_debt > 0).all(axis=1)
+    months = np.where(done, by_debt.max(axis=1), 0)
+
+    for position, name in enumerate(names):
+        span = slice(position * len(extras), (position + 1) * len(extras))
+        result["strategies"][name] = {
+            "order": [int(debts[i]["id"]) for i in orders[name]],
+            "months": [int(m) if m else None for m in months[span]],
+            "debt_free": [month_label(m) for m in months[span]],
+            "total_interest": [
+                to_dollars(round(float(cents))) if finished else None
+                for cents, finished in zip(interest_paid[span], done[span])
+            ],
+            "payoff": [
+                {"id": int(debt["id"]), "month": [month_label(m) for m in by_debt[span, column]]}
+                for column, debt in enumerate(debts)
+            ],
+        }
+    return result
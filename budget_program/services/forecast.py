@@ -0,0 +1,168 @@
+"""Monte Carlo forecasts of when goals will be reached.
+
+Each simulated path replays random months of history: a month's income and
+spending are drawn together from one past month, and what is left after
+subscriptions is that month's savings. Savings are shared among the active
+goals in proportion to their planned monthly contributions. NumPy does the
+sampling for all paths at once; it is imported on first use so the rest of
+the program stays stdlib-only.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import date, timedelta
+
+from database import fetchall
+from money import to_dollars
+from services.budget import (
+    add_months,
+    goal_monthly_contributions,
+    income_by_month,
+    months_between,
+    monthly_subscriptions_total,
+)
+from services.goals import goal_progress_cents
+from services.numeric import require_numpy
+
+DEFAULT_PATHS = 10_000
+MAX_PATHS = 100_000
+DEFAULT_HORIZON_MONTHS = 60
+MAX_HORIZON_MONTHS = 240
+HISTORY_MONTHS = 24
+DAYS_PER_MONTH = 30.44
+
+
+def _spending_by_month(start: str, end: str) -> dict[str, int]:
+    rows = fetchall(
+        """
+        SELECT month, SUM(spent) AS spent
+        FROM category_month_totals
+        WHERE month >= ? AND month <= ?
+        GROUP BY month
+        """,
+        (start, end),
+    )
+    return {r["month"]: int(r["spent"]) for r in rows}
+
+
+def monthly_history(months: int = HISTORY_MONTHS) -> list[dict]:
+    """Income and spending, in cents, for the last ``months`` complete months.
+
+    Months before the first one with any income or spending are left out, so
+    a young ledger is not padded with empty months.
+    """
+    end = add_months(date.today().strftime("%Y-%m"), -1)
+    start = add_months(end, 1 - months)
+    income = income_by_month(start, end)
+    spending = _spending_by_month(start, end)
+    history = [
+        {"month": month, "income": income.get(month, 0), "spending": spending.get(month, 0)}
+        for month in months_between(start, end)
+    ]
+    while history and not (history[0]["income"] or history[0]["spending"]):
+        history.pop(0)
+    return history
+
+
+def _completion_date(months: int | None) -> str | None:
+    if months is None:
+        return None
+    return (date.today() + timedelta(days=round(months * DAYS_PER_MONTH))).isoformat()
+
+
+def forecast_goals(
+    paths: int = DEFAULT_PATHS,
+    horizon_months: int = DEFAULT_HORIZON_MONTHS,
+    seed: int = 0,
+) -> dict:
+    """Completion probabilities and dates for every active goal.
+
+    For each goal: the probability of finishing by its target date (null
+    without one), the probability of finishing within the horizon, and the
+    10th/50th/90th percentile completion dates (null when that percentile
+    falls beyond the horizon). The seed is fixed by default, so the same
+    ledger always gives the same forecast.
+
+    Shares are fixed for the whole run: a finished goal's share is not handed
+    to the others, so forecasts for the rest err on the late side.
+    """
+    np = require_numpy("Goal forecasts")
+    paths = max(1, min(int(paths), MAX_PATHS))
+    horizon = max(1, min(int(horizon_months), MAX_HORIZON_MONTHS))
+
+    history = monthly_history()
+    if not history:
+        raise ValueError("Log some income or expenses before forecasting goals.")
+
+    goals = [g for g in goal_progress_cents() if g["status"] == "ACTIVE" and g["remaining"] > 0]
+    planned = {g["id"]: g["monthly"] for g in goal_monthly_contributions(goals)}
+    due_in = [
+        None if g["days_remaining"] is None else max(math.ceil(g["days_remaining"] / DAYS_PER_MONTH), 0)
+        for g in goals
+    ]
+    # Cover the latest target date so every by-target probability is exact.
+    horizon = min(max([horizon] + [m for m in due_in if m is not None]), MAX_HORIZON_MONTHS)
+
+    subscriptions = monthly_subscriptions_total()
+    surplus = np.array([h["income"] - h["spending"] - subscriptions for h in history], dtype=np.float64)
+
+    result = {
+        "paths": paths,
+        "horizon_months": horizon,
+        "history_months": len(history),
+        "monthly_savings": {
+            "mean": to_dollars(round(float(surplus.mean()))),
+            "min": to_dollars(round(float(surplus.min()))),
+            "max": to_dollars(round(float(surplus.max()))),
+        },
+        "goals": [],
+    }
+    if not goals:
+        return result
+
+    # Undated goals have no planned contribution; weight them as if due at
+    # the end of the horizon.
+    remaining = np.array([g["remaining"] for g in goals], dtype=np.float64)
+    weights = np.array(
+        [planned.get(g["id"]) or g["remaining"] / horizon for g in goals], dtype=np.float64
+    )
+    shares = weights / weights.sum()
+    # Goal g is done once the pooled savings reach this amount.
+    thresholds = remaining / shares
+
+    # paths x months of pooled savings. A month that overspends adds nothing.
+    rng = np.random.default_rng(seed)
+    draws = surplus[rng.integers(0, len(surplus), size=(paths, horizon))]
+    saved = np.cumsum(np.maximum(draws, 0.0), axis=1)
+
+    # saved only grows along a path, so "done by month m" is saved[:, m-1] >= threshold.
+    due = np.array([min(m, horizon) if m is not None else horizon for m in due_in])
+    by_due = np.zeros(len(goals))
+    positive = due > 0
+    by_due[positive] = (saved[:, due[positive] - 1] >= thresholds[positive]).mean(axis=0)
+    within_horizon = (saved[:, -1:] >= thresholds).mean(axis=0)
+
+    # Per-month savings quantiles are non-decreasing too, so a completion-month
+    # percentile is the first month whose matching savings quantile is enough.
+    quantiles = np.quantile(saved, (0.9, 0.5, 0.1), axis=0)
+    first_month = np.stack([np.searchsorted(q, thresholds) + 1 for q in quantiles])
+
+    for index, goal in enumerate(goals):
+        months = [int(m) if m <= horizon else None for m in first_month[:, index]]
+        result["goals"].append(
+            {
+                "id": goal["id"],
+                "name": goal["name"],
+                "type": goal["type"],
+                "remaining": to_dollars(goal["remaining"]),
+                "target_date": goal["target_date"],
+                "share": round(float(shares[index]), 4),
+                "probability_by_target": round(float(by_due[index]), 4) if due_in[index] is not None else None,
+                "probability_within_horizon": round(float(within_horizon[index]), 4),
+                "date_p10": _completion_date(months[0]),
+                "expected_date": _completion_date(months[1]),
+                "date_p90": _completion_date(months[2]),
+            }
+        )
+    return result
@@ -1,13 +1,64 @@
-"""Goal CRUD and progress calculations."""
+"""Goal CRUD and progress calculations.
+
+Amounts are integer cents internally; add/update take dollars and
+get_goal_progress returns dollars for display.
+"""
 
 from __future__ import annotations
 
 from datetime import date, datetime
 
-from database import execute, fetchall, fetchone
+from database import execute, executemany, fetchall, fetchone
+from money import to_cents, with_dollars
 
 GOAL_TYPES = ("target_balance", "contribution_cap", "debt_payoff", "custom")
 
+# Money fields accepted in dollars by add_goal/update_goal and stored as cents.
+_MONEY_FIELDS = ("start_amount", "target_amount", "contribution_limit", "contributed_so_far", "current_amount_override")
+# Cent-valued keys in goal progress rows, converted by present_goal.
+_PROGRESS_MONEY_KEYS = ("target_amount", "current_amount", "remaining", "daily_needed", "monthly_needed")
+
+
+_INSERT_GOAL = """
+    INSERT INTO goals(
+        type, name, link_type, link_id, start_amount, target_amount, target_date,
+        year, contribution_limit, contributed_so_far, current_amount_override, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _goal_params(
+    goal_type: str,
+    name: str,
+    link_type: str | None = None,
+    link_id: int | None = None,
+    start_amount_cents: int | None = None,
+    target_amount: float | None = None,
+    target_date: str | None = None,
+    year: int | None = None,
+    contribution_limit: float | None = None,
+    contributed_so_far: float | None = None,
+    current_amount_override: float | None = None,
+) -> tuple:
+    if goal_type not in GOAL_TYPES:
+        raise ValueError(f"Unsupported goal type: {goal_type}")
+    if goal_type == "debt_payoff" and start_amount_cents is not None and target_amount is None:
+        target_amount = 0.0
+    return (
+        goal_type,
+        name,
+        link_type,
+        link_id,
+        start_amount_cents,
+        to_cents(target_amount),
+        target_date,
+        year,
+        to_cents(contribution_limit),
+        to_cents(contributed_so_far),
+        to_cents(current_amount_override),
+        date.today().isoformat(),
+    )
+
 
 def add_goal(
     goal_type: str,
@@ -24,40 +75,43 @@ def add_goal(
     if goal_type not in GOAL_TYPES:
         raise ValueError(f"Unsupported goal type: {goal_type}")
 
-    start_amount = None
+    start_amount_cents = None
     if goal_type == "debt_payoff" and link_type == "debt" and link_id:
         debt = fetchone("SELECT balance FROM debts WHERE id = ?", (link_id,))
         if not debt:
             raise ValueError("Debt not found for debt_payoff goal")
-        start_amount = float(debt["balance"])
-        if target_amount is None:
-            target_amount = 0.0
+        start_amount_cents = int(debt["balance"])
 
     return execute(
-        """
-        INSERT INTO goals(
-            type, name, link_type, link_id, start_amount, target_amount, target_date,
-            year, contribution_limit, contributed_so_far, current_amount_override, created_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
+        _INSERT_GOAL,
+        _goal_params(
             goal_type,
             name,
             link_type,
             link_id,
-            start_amount,
+            start_amount_cents,
             target_amount,
             target_date,
             year,
             contribution_limit,
             contributed_so_far,
             current_amount_override,
-            date.today().isoformat(),
         ),
     )
 
 
+def add_goals(goals: list[dict]) -> None:
+    """Insert many goals with one executemany call.
+
+    Each dict takes add_goal's keyword arguments plus ``start_amount_cents``;
+    the caller supplies the debt balance for ``debt_payoff`` goals instead of
+    it being looked up per row.
+    """
+    executemany(_INSERT_GOAL, [_goal_params(**goal) for goal in goals])
+
+
 def update_goal(goal_id: int, **kwargs) -> None:
+    """Update goal fields; money fields are given in dollars."""
     allowed = {
         "name",
         "link_type",
@@ -70,7 +124,7 @@ def update_goal(goal_id: int, **kwargs) -> None:
         "contributed_so_far",
         "current_amount_override",
     }
-    changes = {k: v for k, v in kwargs.items() if k in allowed}
+    changes = {k: (to_cents(v) if k in _MONEY_FIELDS else v) for k, v in kwargs.items() if k in allowed}
     if not changes:
         return
 
@@ -94,58 +148,72 @@ def _days_remaining(target_date: str | None) -> int | None:
     return (target - date.today()).days
 
 
-def _linked_current_amount(goal_row) -> float:
+def _linked_current_amount(goal_row) -> int:
+    """Current amount in cents for a goal row carrying a ``linked_balance`` column."""
     link_type = goal_row["link_type"]
     link_id = goal_row["link_id"]
 
     if goal_row["type"] == "custom" and goal_row["current_amount_override"] is not None:
-        return float(goal_row["current_amount_override"])
+        return int(goal_row["current_amount_override"])
 
     if goal_row["type"] == "contribution_cap":
-        return float(goal_row["contributed_so_far"] or 0.0)
+        return int(goal_row["contributed_so_far"] or 0)
 
-    if link_type == "account" and link_id:
-        row = fetchone("SELECT balance FROM accounts WHERE id = ?", (link_id,))
-        return float(row["balance"]) if row else 0.0
+    if link_type in ("account", "debt") and link_id:
+        balance = goal_row["linked_balance"]
+        return int(balance) if balance is not None else 0
 
-    if link_type == "debt" and link_id:
-        row = fetchone("SELECT balance FROM debts WHERE id = ?", (link_id,))
-        return float(row["balance"]) if row else 0.0
+    return int(goal_row["current_amount_override"] or 0)
 
-    return float(goal_row["current_amount_override"] or 0.0)
+
+def _goals_with_linked_balances() -> list:
+    # One pass resolves every linked account/debt balance instead of a lookup per goal.
+    return fetchall(
+        """
+        SELECT g.*,
+               CASE g.link_type
+                   WHEN 'account' THEN a.balance
+                   WHEN 'debt' THEN d.balance
+               END AS linked_balance
+        FROM goals g
+        LEFT JOIN accounts a ON g.link_type = 'account' AND a.id = g.link_id
+        LEFT JOIN debts d ON g.link_type = 'debt' AND d.id = g.link_id
+        ORDER BY g.id
+        """
+    )
 
 
-def get_goal_progress() -> list[dict]:
+def goal_progress_cents() -> list[dict]:
+    """Progress for every goal with all amounts in integer cents."""
     progress_rows = []
-    for goal in list_goals():
+    for goal in _goals_with_linked_balances():
         goal_type = goal["type"]
-        target_amount = float(goal["target_amount"] or 0.0)
+        target_amount = int(goal["target_amount"] or 0)
         current_amount = _linked_current_amount(goal)
         days_remaining = _days_remaining(goal["target_date"])
 
-        remaining = 0.0
+        remaining = 0
         daily_needed = None
         progress = None
 
         if goal_type == "target_balance" or goal_type == "custom":
-            remaining = round(target_amount - current_amount, 2)
+            remaining = target_amount - current_amount
             if days_remaining is not None and days_remaining > 0 and remaining > 0:
-                daily_needed = round(remaining / days_remaining, 2)
+                daily_needed = round(remaining / days_remaining)
 
         elif goal_type == "contribution_cap":
-            limit = float(goal["contribution_limit"] or 0.0)
-            remaining = round(limit - current_amount, 2)
+            limit = int(goal["contribution_limit"] or 0)
+            remaining = limit - current_amount
             if days_remaining is not None and days_remaining > 0 and remaining > 0:
-                daily_needed = round(remaining / days_remaining, 2)
+                daily_needed = round(remaining / days_remaining)
             target_amount = limit
 
         elif goal_type == "debt_payoff":
-            target_amount = float(goal["target_amount"] or 0.0)
-            remaining = round(max(current_amount - target_amount, 0.0), 2)
+            remaining = max(current_amount - target_amount, 0)
             if days_remaining is not None and days_remaining > 0 and remaining > 0:
-                daily_needed = round(remaining / days_remaining, 2)
+                daily_needed = round(remaining / days_remaining)
 
-            start_amount = float(goal["start_amount"] or current_amount)
+            start_amount = int(goal["start_amount"] or current_amount)
             denominator = start_amount - target_amount
             if denominator > 0:
                 progress = round((start_amount - current_amount) / denominator, 4)
@@ -153,23 +221,32 @@ def get_goal_progress() -> list[dict]:
         status = "COMPLETE" if remaining <= 0 else "ACTIVE"
         behind = False
         if status == "ACTIVE" and daily_needed is not None and days_remaining is not None:
-            behind = days_remaining <= 30 and daily_needed > (target_amount * 0.02 if target_amount > 0 else 10)
+            behind = days_remaining <= 30 and daily_needed > (target_amount * 0.02 if target_amount > 0 else 1000)
 
         progress_rows.append(
             {
                 "id": int(goal["id"]),
                 "name": goal["name"],
                 "type": goal_type,
-                "target_amount": round(target_amount, 2),
+                "target_amount": target_amount,
                 "target_date": goal["target_date"],
-                "current_amount": round(current_amount, 2),
-                "remaining": round(remaining, 2),
+                "current_amount": current_amount,
+                "remaining": remaining,
                 "days_remaining": days_remaining,
                 "daily_needed": daily_needed,
-                "monthly_needed": round(daily_needed * 30.44, 2) if daily_needed is not None else None,
+                "monthly_needed": round(daily_needed * 30.44) if daily_needed is not None else None,
                 "status": status,
                 "behind": behind,
                 "progress": progress,
             }
         )
     return progress_rows
+
+
+def present_goal(goal: dict) -> dict:
+    """Convert a goal_progress_cents row to dollars for the API/CLI."""
+    return with_dollars(goal, _PROGRESS_MONEY_KEYS)
+
+
+def get_goal_progress() -> list[dict]:
+    return [present_goal(goal) for goal in goal_progress_cents()]
@@ -0,0 +1,327 @@
+"""Bulk import of bank transactions (CSV and OFX/QFX) into expenses and income.
+
+Files are streamed: rows are parsed one at a time and written in large
+executemany batches, so memory stays bounded no matter how many years of
+history a bank export holds. The whole import runs in one transaction, so a
+bad file never leaves half its rows behind.
+
+Sign convention: money out (negative amounts) becomes an expense and money in
+becomes an income entry, matching how banks export statements. Pass
+``kind="expense"`` or ``kind="income"`` for files where every row is one kind
+with positive amounts.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import re
+from collections.abc import Iterator
+from datetime import datetime
+from typing import BinaryIO, TextIO
+
+from database import executemany, fetchall, fetchone, sync_expense_tags, transaction
+from money import to_cents
+
+BATCH_SIZE = 5000
+IMPORT_FORMATS = ("csv", "ofx", "qfx")
+IMPORT_KINDS = ("expense", "income")
+
+# Header names (lower-cased) recognized for each field when no mapping is given.
+CSV_COLUMNS = {
+    "date": ("date", "posted date", "posting date", "transaction date", "trans. date"),
+    "amount": ("amount", "transaction amount"),
+    "debit": ("debit", "withdrawal", "withdrawals"),
+    "credit": ("credit", "deposit", "deposits"),
+    "category_id": ("category_id", "category id"),
+    "category": ("category",),
+    "note": ("note", "description", "memo", "payee", "name"),
+    "tags": ("tags", "labels"),
+    "source": ("source",),
+}
+
+_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d", "%d.%m.%Y", "%Y%m%d")
+_OFX_TOKEN = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+_OFX_CHUNK = 64 * 1024
+# Line ends as open(newline="") sees them: \n, \r\n or a lone \r.
+_LINE_END = re.compile(r"(?<=\n)|(?<=\r)(?!\n)")
+
+
+class DecodedStream:
+    """Read a binary upload as text, decoding it chunk by chunk.
+
+    Supports what the parsers use: ``read(size)`` and iterating lines with
+    their line ends (as ``newline=""``). io.TextIOWrapper cannot wrap the
+    SpooledTemporaryFile uploads arrive in before Python 3.11, which lacks
+    ``readable()``. A BOM is dropped and undecodable bytes are replaced.
+    """
+
+    def __init__(self, binary: BinaryIO, encoding: str = "utf-8-sig") -> None:
+        self._binary = binary
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def read(self, size: int = -1) -> str:
+        """Up to about ``size`` characters; "" only at the end of the file."""
+        while True:
+            data = self._binary.read(size)
+            # read() with no size reaches the end, so flush the decoder too.
+            text = self._decoder.decode(data, final=not data or size < 0)
+            # A chunk can decode to nothing (a BOM, half a character).
+            if text or not data:
+                return text
+
+    def __iter__(self) -> Iterator[str]:
+        pending = ""
+        while True:
+            chunk = self.read(_OFX_CHUNK)
+            if not chunk:
+                if pending:
+                    yield pending
+                return
+            text, carry = pending + chunk, ""
+            if text.endswith("\r"):
+                # Maybe the first half of a \r\n split across chunks.
+                text, carry = text[:-1], "\r"
+            lines = _LINE_END.split(text)
+            pending = lines.pop() + carry
+            yield from lines
+
+
+def detect_format(filename: str) -> str:
+    suffix = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if suffix not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format '{suffix}'. Use one of {', '.join(IMPORT_FORMATS)}.")
+    return suffix
+
+
+def _parse_date(raw: str) -> str:
+    raw = raw.strip()
+    # OFX dates look like 20240131120000.000[-5:EST]; only the day matters here.
+    if len(raw) >= 8 and raw[:8].isdigit():
+        raw = raw[:8]
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date '{raw}'.")
+
+
+def _parse_amount(raw: str | None) -> int | None:
+    """Parse a bank amount into signed cents; None if missing or invalid."""
+    if raw is None:
+        return None
+    cleaned = raw.strip().replace("$", "").replace(",", "")
+    if not cleaned:
+        return None
+    if cleaned.startswith("(") and cleaned.endswith(")"):
+        cleaned = "-" + cleaned[1:-1]
+    try:
+        return to_cents(cleaned)
+    except ValueError:
+        return None
+
+
+def _resolve_columns(fieldnames: list[str], mapping: dict[str, str] | None) -> dict[str, str]:
+    by_lower = {name.strip().lower(): name for name in fieldnames}
+    columns = {}
+    for field, aliases in CSV_COLUMNS.items():
+        if mapping and field in mapping:
+            if mapping[field] not in fieldnames:
+                raise ValueError(f"Mapped column '{mapping[field]}' not found in CSV header.")
+            columns[field] = mapping[field]
+            continue
+        for alias in aliases:
+            if alias in by_lower:
+                columns[field] = by_lower[alias]
+                break
+    if "date" not in columns:
+        raise ValueError("CSV needs a date column.")
+    if "amount" not in columns and not ("debit" in columns or "credit" in columns):
+        raise ValueError("CSV needs an amount column (or debit/credit columns).")
+    return columns
+
+
+def _iter_csv(stream: TextIO, mapping: dict[str, str] | None) -> Iterator[dict]:
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames:
+        return
+    columns = _resolve_columns(reader.fieldnames, mapping)
+    for row in reader:
+        def value(field: str) -> str | None:
+            column = columns.get(field)
+            return row.get(column) if column else None
+
+        amount = _parse_amount(value("amount"))
+        if amount is None:
+            debit = _parse_amount(value("debit"))
+            credit = _parse_amount(value("credit"))
+            if debit:
+                amount = -abs(debit)
+            elif credit:
+                amount = abs(credit)
+        yield {
+            "date": value("date") or "",
+            "amount": amount,
+            "category_id": value("category_id"),
+            "category": value("category"),
+            "note": value("note"),
+            "tags": value("tags"),
+            "source": value("source"),
+        }
+
+
+def _iter_ofx(stream: TextIO) -> Iterator[dict]:
+    """Yield <STMTTRN> records from an OFX/QFX file, SGML or XML flavored.
+
+    The file is read in fixed-size chunks rather than by line because some
+    banks emit the whole document on a single line.
+    """
+    buffer = ""
+    current: dict | None = None
+    while True:
+        chunk = stream.read(_OFX_CHUNK)
+        buffer += chunk
+        # Keep any trailing partial tag for the next round.
+        cut = max(buffer.rfind("<"), 0) if chunk else len(buffer)
+        complete, buffer = buffer[:cut], buffer[cut:]
+        for closing, tag, text in _OFX_TOKEN.findall(complete):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if current is not None:
+                    yield current
+                current = None if closing else {}
+            elif current is not None and not closing:
+                current[tag] = text.strip()
+        if not chunk:
+            break
+    if current is not None:
+        yield current
+
+
+def _ofx_records(stream: TextIO) -> Iterator[dict]:
+    for trn in _iter_ofx(stream):
+        name = trn.get("NAME") or trn.get("PAYEE") or ""
+        memo = trn.get("MEMO") or ""
+        yield {
+            "date": trn.get("DTPOSTED") or trn.get("DTUSER") or "",
+            "amount": _parse_amount(trn.get("TRNAMT")),
+            "category_id": None,
+            "category": None,
+            "note": " - ".join(part for part in (name, memo) if part),
+            "tags": None,
+            "source": name or None,
+        }
+
+
+def import_transactions(
+    stream: TextIO,
+    fmt: str,
+    default_category_id: int | None = None,
+    kind: str | None = None,
+    mapping: dict[str, str] | None = None,
+) -> dict:
+    """Import every transaction in ``stream`` and return counts per outcome.
+
+    Expenses need a category: a ``category_id`` column, a ``category`` column
+    matching an existing category name, or ``default_category_id``. Rows that
+    cannot be placed are skipped and reported, not fatal.
+    """
+    fmt = fmt.lower()
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format '{fmt}'. Use one of {', '.join(IMPORT_FORMATS)}.")
+    if kind is not None and kind not in IMPORT_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(IMPORT_KINDS)}.")
+
+    # Categories are validated against one cached lookup rather than per row.
+    category_rows = fetchall("SELECT id, name FROM categories")
+    category_ids = {int(r["id"]) for r in category_rows}
+    category_by_name = {r["name"].strip().lower(): int(r["id"]) for r in category_rows}
+    if default_category_id is not None and default_category_id not in category_ids:
+        raise ValueError("Default category not found.")
+
+    records = _iter_csv(stream, mapping) if fmt == "csv" else _ofx_records(stream)
+    counts = {"expenses": 0, "income": 0, "skipped": 0}
+    errors: list[str] = []
+    expense_batch: list[tuple] = []
+    income_batch: list[tuple] = []
+
+    def skip(line: int, reason: str) -> None:
+        counts["skipped"] += 1
+        if len(errors) < 20:
+            errors.append(f"Row {line}: {reason}")
+
+    def flush_expenses() -> None:
+        executemany(
+            "INSERT INTO expenses(date, amount, category_id, paid_amount, note, tags) VALUES (?, ?, ?, 0, ?, ?)",
+            expense_batch,
+        )
+        counts["expenses"] += len(expense_batch)
+        expense_batch.clear()
+
+    def flush_income() -> None:
+        executemany(
+            "INSERT INTO income_entries(date, amount, source, note) VALUES (?, ?, ?, ?)",
+            income_batch,
+        )
+        counts["income"] += len(income_batch)
+        income_batch.clear()
+
+    with transaction():
+        # The write lock is held from here, so every new expense id is above this.
+        first_expense_id = int(fetchone("SELECT COALESCE(MAX(id), 0) + 1 AS next_id FROM expenses")["next_id"])
+        tagged = False
+        for line, record in enumerate(records, start=1):
+            try:
+                entry_date = _parse_date(record["date"])
+            except ValueError as error:
+                skip(line, str(error))
+                continue
+            amount = record["amount"]
+            if not amount:
+                skip(line, "missing, invalid or zero amount")
+                continue
+
+            row_kind = kind or ("expense" if amount < 0 else "income")
+            amount = abs(amount)
+            note = (record["note"] or "").strip() or None
+
+            if row_kind == "income":
+                source = (record["source"] or "").strip() or None
+                income_batch.append((entry_date, amount, source, note))
+                if len(income_batch) >= BATCH_SIZE:
+                    flush_income()
+                continue
+
+            category_id = None
+            if record["category_id"]:
+                try:
+                    category_id = int(record["category_id"])
+                except ValueError:
+                    category_id = None
+                if category_id not in category_ids:
+                    skip(line, f"unknown category id {record['category_id']}")
+                    continue
+            elif record["category"]:
+                category_id = category_by_name.get(record["category"].strip().lower(), default_category_id)
+            else:
+                category_id = default_category_id
+            if category_id is None:
+                skip(line, "no category (set a default category)")
+                continue
+
+            tags = (record["tags"] or "").strip() or None
+            tagged = tagged or tags is not None
+            expense_batch.append((entry_date, amount, category_id, note, tags))
+            if len(expense_batch) >= BATCH_SIZE:
+                flush_expenses()
+
+        if expense_batch:
+            flush_expenses()
+        if income_batch:
+            flush_income()
+        if tagged:
+            sync_expense_tags(first_expense_id)
+
+    counts["errors"] = errors
+    return counts
@@ -0,0 +1,14 @@
+"""Optional NumPy support for the simulation services.
+
+NumPy is only needed by goal forecasts and debt payoff simulation, so it is
+imported on first use and the rest of the program stays stdlib-only.
+"""
+
+
+def require_numpy(feature: str):
+    """Return the numpy module; ValueError naming ``feature`` if it is missing."""
+    try:
+        import numpy
+    except ImportError:
+        raise ValueError(f"{feature} needs NumPy (pip install numpy).") from None
+    return numpy
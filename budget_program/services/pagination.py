@@ -0,0 +1,38 @@
+"""Keyset (cursor) pagination helpers for ledger listings.
+
+Listings are ordered newest first by ``(date, id)``. A cursor is the
+``date:id`` of the last row on a page; the next page continues strictly below
+it, so SQLite seeks the date index instead of skipping OFFSET rows, and deep
+pages cost the same as the first one.
+"""
+
+from __future__ import annotations
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def clamp_limit(limit: int | None) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def encode_cursor(row_date: str, row_id: int) -> str:
+    return f"{row_date}:{row_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    row_date, sep, row_id = cursor.rpartition(":")
+    if not sep or not row_date or not row_id.isdigit():
+        raise ValueError("Invalid cursor.")
+    return row_date, int(row_id)
+
+
+def page(rows: list, limit: int) -> tuple[list, str | None]:
+    """Split ``limit + 1`` fetched rows into the page and the next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last["date"], int(last["id"]))
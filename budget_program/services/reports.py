@@ -1,23 +1,33 @@
-"""Text reporting helpers for dashboard and history views."""
+"""Text reporting helpers for dashboard, history and trend views."""
 
 from __future__ import annotations
 
+from datetime import date
+
 from database import fetchall
-from services.budget import compute_budget_plan
-from services.goals import get_goal_progress
+from money import to_dollars, with_dollars
+from services.budget import (
+    PlanSnapshot,
+    add_months,
+    compute_budget_plan,
+    income_by_month,
+    month_bounds,
+    months_between,
+)
+from services.goals import present_goal
 
 
 def get_dashboard_data() -> dict:
     accounts = fetchall("SELECT * FROM accounts ORDER BY type, name")
     debts = fetchall("SELECT * FROM debts ORDER BY type, name")
-    plan = compute_budget_plan()
-    goals = get_goal_progress()
+    snapshot = PlanSnapshot.load()
+    plan = compute_budget_plan(snapshot)
 
     return {
-        "accounts": accounts,
-        "debts": debts,
+        "accounts": [with_dollars(a, ("balance",)) for a in accounts],
+        "debts": [with_dollars(d, ("balance", "min_payment")) for d in debts],
         "plan": plan,
-        "goals": goals,
+        "goals": [present_goal(g) for g in snapshot.goals],
     }
 
 
@@ -88,7 +98,7 @@ def print_history(limit: int = 10) -> None:
         print("  (none)")
     else:
         for p in income:
-            print(f"  [{p['id']}] {p['date']} amount=${p['amount']:.2f} source={p['source'] or '-'} note={p['note'] or '-'}")
+            print(f"  [{p['id']}] {p['date']} amount=${to_dollars(p['amount']):.2f} source={p['source'] or '-'} note={p['note'] or '-'}")
 
     print("\nRecent Expenses")
     if not expenses:
@@ -96,7 +106,7 @@ def print_history(limit: int = 10) -> None:
     else:
         for e in expenses:
             print(
-                f"  [{e['id']}] {e['date']} category={e['category_id']} amount=${e['amount']:.2f} "
+                f"  [{e['id']}] {e['date']} category={e['category_id']} amount=${to_dollars(e['amount']):.2f} "
                 f"note={e['note'] or '-'} tags={e['tags'] or '-'}"
             )
 
@@ -107,5 +117,123 @@ def print_history(limit: int = 10) -> None:
         for u in updates:
             print(
                 f"  [{u['id']}] {u['date']} {u['entity_type']}:{u['entity_id']} "
-                f"${u['old_balance']:.2f} -> ${u['new_balance']:.2f} note={u['note'] or '-'}"
+                f"${to_dollars(u['old_balance']):.2f} -> ${to_dollars(u['new_balance']):.2f} note={u['note'] or '-'}"
             )
+
+
+# --- Trends ------------------------------------------------------------------
+
+MAX_TREND_MONTHS = 120
+
+
+def get_spending_trends(months: int = 12) -> dict:
+    """Monthly spend per top-level category, income and savings rate for the last ``months`` months.
+
+    Spend comes from one grouped scan of the monthly totals table (with
+    subcategories rolled into their parent) and income from one grouped scan
+    of income entries. Series are parallel arrays aligned with ``months``, in
+    dollars, ready for charting. ``savings_rate`` is null for months without
+    income.
+    """
+    labels = _trend_months(months)
+    position = {month: index for index, month in enumerate(labels)}
+
+    categories = fetchall("SELECT id, name FROM categories WHERE parent_id IS NULL ORDER BY id")
+    spent = {int(c["id"]): [0] * len(labels) for c in categories}
+    rows = fetchall(
+        """
+        SELECT COALESCE(c.parent_id, c.id) AS category_id, t.month, SUM(t.spent) AS spent
+        FROM category_month_totals t
+        JOIN categories c ON c.id = t.category_id
+        WHERE t.month >= ? AND t.month <= ?
+        GROUP BY 1, 2
+        """,
+        (labels[0], labels[-1]),
+    )
+    for r in rows:
+        series = spent.get(int(r["category_id"]))
+        if series is not None:
+            series[position[r["month"]]] = int(r["spent"])
+
+    income_map = income_by_month(labels[0], labels[-1])
+    income = [income_map.get(month, 0) for month in labels]
+    spending = [sum(series[i] for series in spent.values()) for i in range(len(labels))]
+    savings = [inc - out for inc, out in zip(income, spending)]
+
+    return {
+        "months": labels,
+        "categories": [
+            {"id": int(c["id"]), "name": c["name"], "spent": [to_dollars(v) for v in spent[int(c["id"])]]}
+            for c in categories
+        ],
+        "income": [to_dollars(v) for v in income],
+        "spending": [to_dollars(v) for v in spending],
+        "savings": [to_dollars(v) for v in savings],
+        "savings_rate": [round(sav / inc, 4) if inc > 0 else None for sav, inc in zip(savings, income)],
+    }
+
+
+def _trend_months(months: int) -> list[str]:
+    months = max(1, min(int(months), MAX_TREND_MONTHS))
+    end = date.today().strftime("%Y-%m")
+    return months_between(add_months(end, 1 - months), end)
+
+
+def get_tag_trends(months: int = 12) -> dict:
+    """Monthly spend per tag for the last ``months`` months, biggest tags first.
+
+    Shaped like get_spending_trends: ``spent`` arrays align with ``months``.
+    An expense with several tags counts toward each of them.
+    """
+    labels = _trend_months(months)
+    position = {month: index for index, month in enumerate(labels)}
+    first, _ = month_bounds(labels[0])
+    _, after = month_bounds(labels[-1])
+    rows = fetchall(
+        """
+        SELECT t.name, substr(e.date, 1, 7) AS month, SUM(e.amount) AS spent
+        FROM expenses e
+        JOIN expense_tags et ON et.expense_id = e.id
+        JOIN tags t ON t.id = et.tag_id
+        WHERE e.date >= ? AND e.date < ?
+        GROUP BY t.id, month
+        """,
+        (first, after),
+    )
+    spent: dict[str, list[int]] = {}
+    for r in rows:
+        spent.setdefault(r["name"], [0] * len(labels))[position[r["month"]]] = int(r["spent"])
+
+    ranked = sorted(spent.items(), key=lambda item: (-sum(item[1]), item[0]))
+    return {
+        "months": labels,
+        "tags": [
+            {"name": name, "spent": [to_dollars(v) for v in series], "total": to_dollars(sum(series))}
+            for name, series in ranked
+        ],
+    }
+
+
+def print_trends(months: int = 6) -> None:
+    trends = get_spending_trends(months)
+    labels = trends["months"]
+    width = max(len(c["name"]) for c in trends["categories"]) if trends["categories"] else 8
+    width = max(width, len("Savings rate"))
+
+    print("\n=== TRENDS ===\n")
+    print(" " * width + "".join(f"{month:>11}" for month in labels))
+    for c in trends["categories"]:
+        print(f"{c['name']:<{width}}" + "".join(f"{v:>11.2f}" for v in c["spent"]))
+    print(f"{'Spending':<{width}}" + "".join(f"{v:>11.2f}" for v in trends["spending"]))
+    print(f"{'Income':<{width}}" + "".join(f"{v:>11.2f}" for v in trends["income"]))
+    print(f"{'Savings':<{width}}" + "".join(f"{v:>11.2f}" for v in trends["savings"]))
+    print(
+        f"{'Savings rate':<{width}}"
+        + "".join(f"{rate * 100:>10.1f}%" if rate is not None else f"{'-':>11}" for rate in trends["savings_rate"])
+    )
+
+    tags = get_tag_trends(months)["tags"][:10]
+    if tags:
+        print("\nTop tags")
+        for t in tags:
+            print(f"#{t['name'][:width - 1]:<{width - 1}}" + "".join(f"{v:>11.2f}" for v in t["spent"]))
@@ -0,0 +1,28 @@
+"""Shared fixtures. The app uses flat imports, so budget_program/ goes on sys.path."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point the database helpers at a scratch file for one test."""
+    path = tmp_path / "budget.db"
+    monkeypatch.setattr(database, "DB_PATH", path)
+    yield path
+    database.close_all()
+
+
+@pytest.fixture
+def client(db_path):
+    """A test client for the web app on a fresh database."""
+    database.init_db()
+    from web_app import app
+
+    return app.test_client()
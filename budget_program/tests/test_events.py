@@ -0,0 +1,26 @@
+"""Limits on the live-update event streams."""
+
+import threading
+
+
+def test_event_streams_are_capped(client, monkeypatch):
+    import web_app  # after the client fixture, so its init_db uses the scratch file
+
+    monkeypatch.setattr(web_app, "_event_streams", threading.BoundedSemaphore(1))
+
+    first = client.get("/api/events", buffered=False)
+    assert first.status_code == 200
+    assert next(first.response) == b"retry: 3000\n\n"
+
+    refused = client.get("/api/events", buffered=False)
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == str(web_app.EVENT_KEEPALIVE_S)
+
+    # Closing a stream frees its slot, even one never read from.
+    first.close()
+    unread = client.get("/api/events", buffered=False)
+    assert unread.status_code == 200
+    unread.close()
+    second = client.get("/api/events", buffered=False)
+    assert second.status_code == 200
+    second.close()
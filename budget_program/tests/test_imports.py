@@ -0,0 +1,83 @@
+"""Bank imports through the upload endpoint."""
+
+import io
+
+import database
+import services.imports
+from services.imports import DecodedStream
+
+CSV = (
+    "﻿Date,Description,Amount,Category\r\n"
+    "2025-02-03,Costco run,-42.10,Groceries\r\n"
+    '02/04/2025,"Farmers market, café",-12.34,Groceries\r\n'
+    "2025-02-05,Paycheck,1900.00,\r\n"
+)
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250206<TRNAMT>-5.25<NAME>Coffee</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250207<TRNAMT>20.00<NAME>Refund</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def _setup(client):
+    response = client.post(
+        "/api/setup",
+        json={"accounts": [{"name": "Checking", "type": "checking", "balance": 100}], "categories": [["Groceries", 100]]},
+    )
+    assert response.status_code == 201
+
+
+def _upload(client, name: str, text: str, **form):
+    return client.post(
+        "/api/import",
+        data={"file": (io.BytesIO(text.encode("utf-8")), name), **form},
+        content_type="multipart/form-data",
+    )
+
+
+def test_csv_upload(client):
+    _setup(client)
+    response = _upload(client, "statement.csv", CSV)
+    assert response.status_code == 201, response.json
+    assert (response.json["expenses"], response.json["income"], response.json["skipped"]) == (2, 1, 0)
+    rows = database.fetchall("SELECT date, amount, note FROM expenses ORDER BY date")
+    assert [tuple(r) for r in rows] == [
+        ("2025-02-03", 4210, "Costco run"),
+        ("2025-02-04", 1234, "Farmers market, café"),
+    ]
+
+
+def test_ofx_upload_split_across_chunks(client, monkeypatch):
+    # Tiny reads put tags, and the end of each line, across chunk boundaries.
+    monkeypatch.setattr(services.imports, "_OFX_CHUNK", 7)
+    _setup(client)
+    response = _upload(client, "statement.qfx", OFX, category_id="1")
+    assert response.status_code == 201, response.json
+    assert (response.json["expenses"], response.json["income"]) == (1, 1)
+    assert database.fetchone("SELECT amount FROM income_entries")["amount"] == 2000
+
+
+def test_bad_upload_is_a_client_error(client):
+    _setup(client)
+    assert _upload(client, "statement.pdf", CSV).status_code == 400
+
+
+class _ReadOnly:
+    """Only read(), like SpooledTemporaryFile before Python 3.11 (no readable())."""
+
+    def __init__(self, data: bytes) -> None:
+        self._buffer = io.BytesIO(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+def test_decoded_stream_matches_text_mode(monkeypatch):
+    data = "﻿a,b\r\n\"x\ny\",é\rlast\nend".encode("utf-8")
+    expected = list(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline=""))
+    for chunk in (1, 2, 3, 64):
+        monkeypatch.setattr(services.imports, "_OFX_CHUNK", chunk)
+        assert list(DecodedStream(_ReadOnly(data))) == expected
+    assert DecodedStream(_ReadOnly(b"caf\xc3")).read() == "caf�"
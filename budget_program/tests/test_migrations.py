@@ -0,0 +1,163 @@
+"""Upgrading a database created before integer cents (schema version 0)."""
+
+import sqlite3
+
+import pytest
+
+import database
+from money import to_cents, to_dollars
+from services.allocations import search_expenses
+from services.balances import balance_history, balances_on, set_balance
+
+# The original schema: money in REAL dollars, no indexes, no user_version.
+BASELINE_SCHEMA = [
+    """
+    CREATE TABLE accounts(
+        id INTEGER PRIMARY KEY, name TEXT NOT NULL, institution TEXT, type TEXT NOT NULL,
+        balance REAL NOT NULL, interest_rate REAL, created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE debts(
+        id INTEGER PRIMARY KEY, name TEXT NOT NULL, institution TEXT, type TEXT NOT NULL,
+        balance REAL NOT NULL, interest_rate REAL, min_payment REAL, due_day INTEGER,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE categories(
+        id INTEGER PRIMARY KEY, name TEXT NOT NULL, parent_id INTEGER, allocation_pct REAL NOT NULL,
+        created_at TEXT NOT NULL, FOREIGN KEY(parent_id) REFERENCES categories(id)
+    )
+    """,
+    "CREATE TABLE income_entries(id INTEGER PRIMARY KEY, date TEXT NOT NULL, amount REAL NOT NULL, source TEXT, note TEXT)",
+    """
+    CREATE TABLE income_profile(
+        id INTEGER PRIMARY KEY CHECK (id = 1), expected_amount REAL, cadence TEXT, updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE recurring_expenses(
+        id INTEGER PRIMARY KEY, name TEXT NOT NULL, amount REAL NOT NULL, cadence TEXT NOT NULL,
+        category_id INTEGER, due_day INTEGER, active INTEGER NOT NULL DEFAULT 1, created_at TEXT NOT NULL,
+        FOREIGN KEY(category_id) REFERENCES categories(id)
+    )
+    """,
+    """
+    CREATE TABLE expenses(
+        id INTEGER PRIMARY KEY, date TEXT NOT NULL, amount REAL NOT NULL, category_id INTEGER NOT NULL,
+        paid_amount REAL NOT NULL DEFAULT 0, note TEXT, tags TEXT,
+        FOREIGN KEY(category_id) REFERENCES categories(id)
+    )
+    """,
+    """
+    CREATE TABLE account_allocations(
+        id INTEGER PRIMARY KEY, date TEXT NOT NULL, account_id INTEGER NOT NULL, target_type TEXT NOT NULL,
+        target_id INTEGER NOT NULL, amount REAL NOT NULL, note TEXT,
+        FOREIGN KEY(account_id) REFERENCES accounts(id)
+    )
+    """,
+    """
+    CREATE TABLE balance_updates(
+        id INTEGER PRIMARY KEY, date TEXT NOT NULL, entity_type TEXT NOT NULL, entity_id INTEGER NOT NULL,
+        old_balance REAL NOT NULL, new_balance REAL NOT NULL, note TEXT
+    )
+    """,
+    """
+    CREATE TABLE goals(
+        id INTEGER PRIMARY KEY, type TEXT NOT NULL, name TEXT NOT NULL, link_type TEXT, link_id INTEGER,
+        start_amount REAL, target_amount REAL, target_date TEXT, year INTEGER, contribution_limit REAL,
+        contributed_so_far REAL, current_amount_override REAL, created_at TEXT NOT NULL
+    )
+    """,
+]
+
+
+@pytest.fixture
+def legacy_db(db_path):
+    conn = sqlite3.connect(db_path)
+    for stmt in BASELINE_SCHEMA:
+        conn.execute(stmt)
+    conn.executescript(
+        """
+        INSERT INTO accounts VALUES (1, 'Checking', NULL, 'checking', 1000.5, NULL, '2025-01-15');
+        INSERT INTO debts VALUES (1, 'Card', NULL, 'credit_card', 500.25, 19.9, 25, 5, '2025-01-15');
+        INSERT INTO categories VALUES (1, 'Groceries', NULL, 100, '2025-01-15');
+        INSERT INTO expenses VALUES (1, '2025-02-03', 1.005, 1, 0.005, 'Costco run', 'food, bulk');
+        INSERT INTO expenses VALUES (2, '2025-02-04', 12.34, 1, 0, 'Farmers market', NULL);
+        INSERT INTO balance_updates VALUES (1, '2025-03-10', 'account', 1, 800, 1000.5, 'paycheck');
+        """
+    )
+    conn.commit()
+    conn.close()
+    database.init_db()
+    return db_path
+
+
+@pytest.mark.parametrize(
+    ("dollars", "cents"),
+    [(0.005, 1), (1.005, 101), ("2.675", 268), (-1.005, -101), (0.1 + 0.2, 30), (None, None)],
+)
+def test_to_cents_rounds_half_up(dollars, cents):
+    assert to_cents(dollars) == cents
+
+
+def test_to_cents_rejects_non_numbers():
+    with pytest.raises(ValueError):
+        to_cents("twelve")
+
+
+def test_migration_stores_integer_cents(legacy_db):
+    assert database.fetchone("PRAGMA user_version")[0] == database.SCHEMA_VERSION
+    account = database.fetchone("SELECT typeof(balance) AS kind, balance FROM accounts")
+    assert (account["kind"], account["balance"]) == ("integer", 100050)
+    debt = database.fetchone("SELECT balance, min_payment FROM debts")
+    assert (debt["balance"], debt["min_payment"]) == (50025, 2500)
+    expense = database.fetchone("SELECT amount, paid_amount FROM expenses WHERE id = 1")
+    # Same rounding as to_cents, not SQL ROUND (which gives 100 for 1.005).
+    assert (expense["amount"], expense["paid_amount"]) == (101, 1)
+    update = database.fetchone("SELECT old_balance, new_balance FROM balance_updates")
+    assert (update["old_balance"], update["new_balance"]) == (80000, 100050)
+    assert to_dollars(account["balance"]) == 1000.5
+
+
+def test_migration_backfills_search_and_tags(legacy_db):
+    try:
+        found = search_expenses("costco")
+    except ValueError:
+        pytest.skip("SQLite without FTS5")
+    assert [item["id"] for item in found["items"]] == [1]
+    tags = database.fetchall(
+        "SELECT t.name FROM expense_tags et JOIN tags t ON t.id = et.tag_id WHERE et.expense_id = 1 ORDER BY t.name"
+    )
+    assert [row["name"] for row in tags] == ["bulk", "food"]
+    assert database.fetchone("SELECT COUNT(*) FROM expense_tags WHERE expense_id = 2")[0] == 0
+
+
+def test_balances_on_past_dates(legacy_db):
+    # init_db writes month-end checkpoints for the migrated history.
+    assert database.fetchone("SELECT COUNT(*) FROM balance_snapshots WHERE date = '2025-02-28'")[0] == 2
+
+    before = balances_on("2025-02-28")
+    assert [a["balance"] for a in before["accounts"]] == [800.0]
+    assert [d["balance"] for d in before["debts"]] == [500.25]
+    assert before["net_worth"] == 299.75
+
+    assert [a["balance"] for a in balances_on("2025-03-31")["accounts"]] == [1000.5]
+    # Nothing existed yet.
+    assert balances_on("2025-01-01")["accounts"] == []
+
+
+def test_balance_reads_do_not_checkpoint(legacy_db, monkeypatch):
+    # As if the process had run into a new month since startup.
+    monkeypatch.setattr(database, "_checkpointed_through", {})
+    database.execute("DELETE FROM balance_snapshots")
+
+    assert [a["balance"] for a in balances_on("2025-02-28")["accounts"]] == [800.0]
+    balance_history("2025-01-01", "2025-03-31", "month")
+    assert database.fetchone("SELECT COUNT(*) FROM balance_snapshots")[0] == 0
+
+    # The next balance change catches the checkpoints up first.
+    set_balance("account", 1, 1200)
+    assert database.fetchone("SELECT COUNT(*) FROM balance_snapshots WHERE date = '2025-02-28'")[0] == 2
+    assert [a["balance"] for a in balances_on("2025-02-28")["accounts"]] == [800.0]
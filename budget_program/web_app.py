@@ -1,29 +1,65 @@
 """Flask web dashboard for the budget program."""
 
+import json
+import os
+import queue
+import threading
+import time
 from datetime import date
-
-from flask import Flask, jsonify, render_template, request
-
-from database import execute, fetchall, init_db
+from functools import cached_property, wraps
+
+from flask import Flask, Response, g, jsonify, make_response, render_template, request
+
+import metrics
+from database import (
+    begin_ledger,
+    begin_query_stats,
+    data_version,
+    end_ledger,
+    end_query_stats,
+    execute,
+    executemany,
+    fetchall,
+    init_db,
+    ledger_exists,
+    read_replica,
+    transaction,
+    use_ledger,
+)
+from events import broker
+from money import to_cents, to_dollars, with_dollars
 from services.allocations import (
     add_expense as add_expense_service,
     allocate_from_account,
     get_all_categories,
     get_pending_expenses,
     list_recent_expenses,
+    query_expenses,
+    search_expenses,
     update_expense,
 )
+from services.balances import balance_history, balances_on
 from services.budget import (
+    PlanSnapshot,
     add_income,
     add_recurring,
+    add_recurring_many,
     compute_budget_plan,
+    compute_budget_plans,
     delete_recurring,
     get_income_profile,
     list_recent_income,
     list_recurring,
+    present_income_profile,
+    query_income,
     set_income_profile,
 )
-from services.goals import add_goal, delete_goal, get_goal_progress
+from services.debts import MAX_SCENARIOS, simulate_payoff
+from services.forecast import DEFAULT_HORIZON_MONTHS, DEFAULT_PATHS, forecast_goals
+from services.goals import add_goal, add_goals, delete_goal, get_goal_progress, goal_progress_cents, present_goal
+from services.imports import DecodedStream, detect_format, import_transactions
+from services.pagination import clamp_limit
+from services.reports import get_spending_trends, get_tag_trends
 
 app = Flask(__name__, template_folder="templates")
 app.config["JSON_SORT_KEYS"] = False
@@ -37,12 +73,51 @@ def _to_float(value, default=None):
     return float(value)
 
 
+def _to_cents(value, default=None):
+    if value is None or value == "":
+        return default
+    return to_cents(value)
+
+
 def _to_int(value, default=None):
     if value is None or value == "":
         return default
     return int(value)
 
 
+def _data_etag() -> str:
+    # Day counts and the current month roll over at midnight without any
+    # write, so the date is part of the validator. Ledgers number their
+    # versions independently, so the ledger is too.
+    return f"{g.get('ledger') or ''}-{data_version()}-{date.today().isoformat()}"
+
+
+def conditional_on_data(view):
+    """Answer GETs with 304 when the client's ETag matches the data version.
+
+    Matching requests return before the view runs, so no service code or
+    serialization happens for an unchanged dashboard. With
+    BUDGET_READ_REPLICA on, the version and the view both come from the
+    in-memory replica, so the ETag always matches the data served.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != "GET":
+            return view(*args, **kwargs)
+        with read_replica():
+            etag = _data_etag()
+            if request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    return wrapper
+
+
 @app.route("/")
 def index():
     return render_template("dashboard.html")
@@ -53,38 +128,343 @@ def setup():
     return render_template("setup.html")
 
 
+class _DashboardData:
+    """Loads what the requested dashboard sections need, each at most once."""
+
+    @cached_property
+    def accounts(self) -> list:
+        return fetchall("SELECT * FROM accounts ORDER BY type, name")
+
+    @cached_property
+    def debts(self) -> list:
+        return fetchall("SELECT * FROM debts ORDER BY type, name")
+
+    @cached_property
+    def goals(self) -> list[dict]:
+        return goal_progress_cents()
+
+    @cached_property
+    def snapshot(self) -> PlanSnapshot:
+        return PlanSnapshot.load(goals=self.goals)
+
+    def income_profile(self) -> dict | None:
+        if "snapshot" in self.__dict__:
+            return present_income_profile(self.snapshot.income_profile)
+        return get_income_profile()
+
+    def totals(self) -> dict:
+        total_accounts = sum(int(a["balance"]) for a in self.accounts)
+        total_debts = sum(int(d["balance"]) for d in self.debts)
+        return {
+            "accounts": to_dollars(total_accounts),
+            "debts": to_dollars(total_debts),
+            "net_worth": to_dollars(total_accounts - total_debts),
+        }
+
+
+# Section name -> builder. Clients pick a subset with ?sections=plan,goals and
+# only those sections' queries run.
+DASHBOARD_SECTIONS = {
+    "accounts": lambda data: [with_dollars(a, ("balance",)) for a in data.accounts],
+    "debts": lambda data: [with_dollars(d, ("balance", "min_payment")) for d in data.debts],
+    "plan": lambda data: compute_budget_plan(data.snapshot),
+    "all_categories": lambda data: get_all_categories(),
+    "goals": lambda data: [present_goal(goal) for goal in data.goals],
+    "income_profile": lambda data: data.income_profile(),
+    "recent_income": lambda data: list_recent_income(limit=20),
+    "recent_expenses": lambda data: list_recent_expenses(limit=50),
+    "pending_expenses": lambda data: get_pending_expenses(limit=50),
+    "totals": lambda data: data.totals(),
+}
+
+
 @app.route("/api/dashboard")
+@conditional_on_data
 def api_dashboard():
-    accounts = fetchall("SELECT * FROM accounts ORDER BY type, name")
-    debts = fetchall("SELECT * FROM debts ORDER BY type, name")
-    plan = compute_budget_plan()
-    all_categories = get_all_categories()
-    goals = get_goal_progress()
+    requested = request.args.get("sections")
+    if requested:
+        sections = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in sections if name not in DASHBOARD_SECTIONS]
+        if unknown:
+            return jsonify({"error": f"Unknown dashboard sections: {', '.join(unknown)}."}), 400
+    else:
+        sections = list(DASHBOARD_SECTIONS)
+
+    data = _DashboardData()
+    return jsonify({name: DASHBOARD_SECTIONS[name](data) for name in sections})
+
+
+@app.route("/api/plan")
+@conditional_on_data
+def get_plan():
+    """The budget plan for ``?month=YYYY-MM`` (default: this month)."""
+    try:
+        return jsonify(compute_budget_plan(month=request.args.get("month") or None))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
+@app.route("/api/plans")
+@conditional_on_data
+def get_plans():
+    """One plan per month from ``?start=`` through ``?end=`` (``YYYY-MM``; end defaults to this month)."""
+    start = request.args.get("start")
+    if not start:
+        return jsonify({"error": "start month is required (YYYY-MM)."}), 400
+    try:
+        return jsonify(compute_budget_plans(start, request.args.get("end") or date.today().strftime("%Y-%m")))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
 
-    total_accounts = sum(float(a["balance"]) for a in accounts)
-    total_debts = sum(float(d["balance"]) for d in debts)
-    net_worth = total_accounts - total_debts
+@app.route("/api/reports/trends")
+@conditional_on_data
+def spending_trends():
+    """Per-category spend, income and savings rate for the last ``?months=`` (default 12)."""
+    try:
+        return jsonify(get_spending_trends(_to_int(request.args.get("months"), 12)))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
 
+
+@app.route("/api/reports/tags")
+@conditional_on_data
+def tag_trends():
+    """Monthly spend per tag for the last ``?months=`` (default 12)."""
+    try:
+        return jsonify(get_tag_trends(_to_int(request.args.get("months"), 12)))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
+# --- Request metrics ---------------------------------------------------------
+
+# Set BUDGET_METRICS=0 to skip per-request SQL timing and the Server-Timing header.
+app.config["REQUEST_METRICS"] = os.environ.get("BUDGET_METRICS", "1") != "0"
+
+
+@app.before_request
+def start_request_metrics():
+    if app.config["REQUEST_METRICS"]:
+        g.request_started = time.perf_counter()
+        g.query_stats, g.query_stats_token = begin_query_stats()
+
+
+# Registered before the other after_request hooks so it runs last and its
+# timing includes them (Flask calls after_request hooks in reverse order).
+@app.after_request
+def record_request_metrics(response):
+    stats = g.get("query_stats")
+    if stats is None:
+        return response
+    duration_ms = (time.perf_counter() - g.request_started) * 1000.0
+    route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+    metrics.registry.observe(route, duration_ms, response.status_code, stats)
+    response.headers["Server-Timing"] = (
+        f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries", app;dur={duration_ms:.2f}'
+    )
+    return response
+
+
+@app.teardown_request
+def stop_request_metrics(_error=None):
+    token = g.pop("query_stats_token", None)
+    if token is not None:
+        end_query_stats(token)
+
+
+@app.route("/api/_metrics", methods=["GET", "DELETE"])
+def request_metrics():
+    """Per-route latency and SQL histograms since startup; DELETE resets them."""
+    if request.method == "DELETE":
+        metrics.registry.reset()
+        return jsonify({"success": True})
     return jsonify(
         {
-            "accounts": [dict(a) for a in accounts],
-            "debts": [dict(d) for d in debts],
-            "plan": plan,
-            "all_categories": all_categories,
-            "goals": [dict(g) for g in goals],
-            "income_profile": get_income_profile(),
-            "recent_income": list_recent_income(limit=20),
-            "recent_expenses": list_recent_expenses(limit=50),
-            "pending_expenses": get_pending_expenses(limit=50),
-            "totals": {
-                "accounts": round(total_accounts, 2),
-                "debts": round(total_debts, 2),
-                "net_worth": round(net_worth, 2),
-            },
+            "enabled": app.config["REQUEST_METRICS"],
+            "latency_buckets_ms": list(metrics.LATENCY_BUCKETS_MS),
+            "query_count_buckets": list(metrics.QUERY_COUNT_BUCKETS),
+            "routes": metrics.registry.snapshot(),
         }
     )
 
 
+# --- Ledgers -----------------------------------------------------------------
+
+# A request picks its ledger with the X-Ledger header, ?ledger= (remembered in
+# a cookie for the browser dashboard) or that cookie; with none it uses the
+# default database. Ledger names select data, they do not authenticate: put
+# the app behind something that does before hosting several households.
+LEDGER_COOKIE = "ledger"
+# Pages only render templates: they remember the ledger for the API calls
+# they make but never open it, so /setup?ledger=new works before it exists.
+_PAGE_ENDPOINTS = {"index", "setup"}
+
+
+def _requested_ledger() -> str | None:
+    return (
+        request.headers.get("X-Ledger")
+        or request.args.get("ledger")
+        or request.cookies.get(LEDGER_COOKIE)
+        or None
+    )
+
+
+@app.before_request
+def select_ledger():
+    name = _requested_ledger()
+    if name is None or request.endpoint == "static":
+        return None
+    try:
+        exists = ledger_exists(name)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    if request.endpoint in _PAGE_ENDPOINTS:
+        g.ledger = name
+        return None
+    # Completing setup is how a new ledger is created.
+    if not exists and request.endpoint != "complete_setup":
+        return jsonify({"error": f"Unknown ledger '{name}'."}), 404
+    g.ledger = name
+    g.ledger_token = begin_ledger(name)
+    return None
+
+
+@app.after_request
+def remember_ledger(response):
+    name = request.args.get("ledger")
+    if name and g.get("ledger") == name and request.cookies.get(LEDGER_COOKIE) != name:
+        response.set_cookie(LEDGER_COOKIE, name, httponly=True, samesite="Lax")
+    return response
+
+
+@app.teardown_request
+def release_ledger(_error=None):
+    token = g.pop("ledger_token", None)
+    if token is not None:
+        end_ledger(token)
+
+
+# --- Live change events (server-sent events) -------------------------------
+
+# Seconds between keepalive comments on an idle stream.
+EVENT_KEEPALIVE_S = 15
+# Seconds between checks of the data version for writes made by other
+# processes (other workers), which this process's broker never sees.
+EVENT_POLL_S = 2
+
+# Each open stream holds a server thread for as long as the dashboard stays
+# open, so only part of the pool may serve them; the rest keep answering
+# ordinary requests. Dashboards turned away fall back to polling.
+_WEB_THREADS = int(os.environ.get("BUDGET_WEB_THREADS", "8"))
+MAX_EVENT_STREAMS = int(os.environ.get("BUDGET_MAX_EVENT_STREAMS", str(max(1, _WEB_THREADS // 2))))
+_event_streams = threading.BoundedSemaphore(MAX_EVENT_STREAMS)
+
+# Write endpoint -> (event type, dashboard sections whose lists it changes).
+# Plan figures and totals travel inside every event, so those sections are
+# only listed when their row lists (subscriptions, goal reserves) change.
+WRITE_EVENTS = {
+    "add_account": ("account.created", ["accounts"]),
+    "add_debt": ("debt.created", ["debts"]),
+    "add_category": ("category.created", ["all_categories"]),
+    "post_income": ("income.created", ["recent_income"]),
+    "income_profile": ("income_profile.updated", ["income_profile"]),
+    "recurring": ("recurring.created", ["plan"]),
+    "remove_recurring": ("recurring.deleted", ["plan"]),
+    "goals": ("goal.created", ["goals", "plan"]),
+    "remove_goal": ("goal.deleted", ["goals", "plan"]),
+    "add_expense": ("expense.created", ["recent_expenses", "pending_expenses"]),
+    "patch_expense": ("expense.updated", ["recent_expenses", "pending_expenses"]),
+    "allocate_account": ("balance.changed", ["accounts", "debts", "goals", "recent_expenses", "pending_expenses"]),
+    "import_file": ("import.completed", list(DASHBOARD_SECTIONS)),
+    "complete_setup": ("setup.completed", list(DASHBOARD_SECTIONS)),
+}
+
+# Plan keys that hold row lists; everything else in the plan is a compact figure.
+_PLAN_LIST_KEYS = ("subscriptions", "goal_contributions")
+
+
+def _change_event(event_type: str, sections: list[str], entity_id) -> dict:
+    """Describe a write with fresh plan figures, computed once for every listener."""
+    data = _DashboardData()
+    plan = compute_budget_plan(data.snapshot)
+    return {
+        "type": event_type,
+        "id": entity_id,
+        "version": data_version(),
+        "sections": sections,
+        "plan": {key: value for key, value in plan.items() if key not in _PLAN_LIST_KEYS},
+        "totals": data.totals(),
+    }
+
+
+@app.after_request
+def publish_write_event(response):
+    write = WRITE_EVENTS.get(request.endpoint)
+    if write is None or request.method == "GET" or response.status_code >= 300:
+        return response
+    topic = g.get("ledger") or ""
+    if broker.has_subscribers(topic):
+        body = response.get_json(silent=True) or {}
+        entity_id = body.get("id") if isinstance(body, dict) else None
+        if entity_id is None and request.view_args:
+            entity_id = next(iter(request.view_args.values()))
+        broker.publish(_change_event(write[0], write[1], entity_id), topic)
+    return response
+
+
+@app.route("/api/events")
+def events():
+    """Stream change events so open dashboards update without re-polling."""
+    if not _event_streams.acquire(blocking=False):
+        response = jsonify({"error": "Too many open event streams."})
+        response.headers["Retry-After"] = str(EVENT_KEEPALIVE_S)
+        return response, 503
+
+    # The stream outlives the request context (and its ledger selection), so
+    # it selects the ledger again whenever it reads the database.
+    ledger = g.get("ledger")
+    topic = ledger or ""
+
+    def current_version() -> int:
+        with use_ledger(ledger):
+            return data_version()
+
+    def stream():
+        subscriber = broker.subscribe(topic)
+        seen_version = current_version()
+        quiet_since = time.monotonic()
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = subscriber.get(timeout=EVENT_POLL_S)
+                except queue.Empty:
+                    version = current_version()
+                    if version == seen_version:
+                        if time.monotonic() - quiet_since >= EVENT_KEEPALIVE_S:
+                            quiet_since = time.monotonic()
+                            yield ": keepalive\n\n"
+                        continue
+                    # Written by another process; this broker never saw it.
+                    event = {"type": "resync", "version": version}
+                seen_version = max(seen_version, event.get("version") or 0)
+                quiet_since = time.monotonic()
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscriber, topic)
+
+    response = Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # On close rather than in stream(): a generator closed before its first
+    # item never runs its finally block.
+    response.call_on_close(_event_streams.release)
+    return response
+
+
 # --- Accounts & debts --------------------------------------------------------
 
 @app.route("/api/accounts", methods=["POST"])
@@ -96,7 +476,7 @@ def add_account():
             data.get("name"),
             data.get("institution") or None,
             data.get("type"),
-            _to_float(data.get("balance"), 0.0),
+            _to_cents(data.get("balance"), 0),
             _to_float(data.get("interest_rate")),
             date.today().isoformat(),
         ),
@@ -116,9 +496,9 @@ def add_debt():
             data.get("name"),
             data.get("institution") or None,
             data.get("type"),
-            _to_float(data.get("balance"), 0.0),
+            _to_cents(data.get("balance"), 0),
             _to_float(data.get("interest_rate")),
-            _to_float(data.get("min_payment")),
+            _to_cents(data.get("min_payment")),
             _to_int(data.get("due_day")),
             date.today().isoformat(),
         ),
@@ -126,6 +506,55 @@ def add_debt():
     return jsonify({"id": debt_id}), 201
 
 
+@app.route("/api/balances")
+@conditional_on_data
+def balances():
+    """Every account/debt balance and net worth at the end of ``?date=`` (default today)."""
+    try:
+        return jsonify(balances_on(request.args.get("date") or None))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
+@app.route("/api/balances/history")
+@conditional_on_data
+def balances_history():
+    """Balance and net-worth series for ``?start=&end=`` by ``?interval=`` day/week/month."""
+    args = request.args
+    try:
+        return jsonify(
+            balance_history(
+                start=args.get("start") or None,
+                end=args.get("end") or None,
+                interval=args.get("interval") or "month",
+            )
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
+@app.route("/api/debts/payoff")
+@conditional_on_data
+def debt_payoff():
+    """Avalanche/snowball/custom payoff plans for each extra monthly payment.
+
+    ``?extra=0,100,250`` lists the amounts; ``?max_extra=500&steps=100``
+    sweeps 0..max_extra instead. ``?order=3,1`` adds a custom order (debt ids).
+    """
+    args = request.args
+    try:
+        if args.get("max_extra"):
+            top = float(args["max_extra"])
+            steps = max(1, min(_to_int(args.get("steps"), 100), MAX_SCENARIOS))
+            extras = [round(top * step / steps, 2) for step in range(steps + 1)]
+        else:
+            extras = [float(value) for value in args.get("extra", "0").split(",") if value.strip()]
+        order = [int(value) for value in args.get("order", "").split(",") if value.strip()]
+        return jsonify(simulate_payoff(extras, order=order or None))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
 # --- Categories --------------------------------------------------------------
 
 @app.route("/api/categories/all")
@@ -165,6 +594,25 @@ def post_income():
         return jsonify({"error": str(error)}), 400
 
 
+@app.route("/api/income", methods=["GET"])
+def get_income():
+    args = request.args
+    try:
+        return jsonify(
+            query_income(
+                start_date=args.get("start") or None,
+                end_date=args.get("end") or None,
+                min_amount=_to_float(args.get("min_amount")),
+                max_amount=_to_float(args.get("max_amount")),
+                source=args.get("source") or None,
+                cursor=args.get("cursor") or None,
+                limit=_to_int(args.get("limit")),
+            )
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
 @app.route("/api/income-profile", methods=["GET", "POST"])
 def income_profile():
     if request.method == "GET":
@@ -183,6 +631,7 @@ def income_profile():
 # --- Recurring subscriptions -------------------------------------------------
 
 @app.route("/api/recurring", methods=["GET", "POST"])
+@conditional_on_data
 def recurring():
     if request.method == "GET":
         return jsonify(list_recurring(active_only=True))
@@ -209,6 +658,7 @@ def remove_recurring(recurring_id: int):
 # --- Goals -------------------------------------------------------------------
 
 @app.route("/api/goals", methods=["GET", "POST"])
+@conditional_on_data
 def goals():
     if request.method == "GET":
         return jsonify(get_goal_progress())
@@ -231,6 +681,21 @@ def goals():
         return jsonify({"error": str(error)}), 400
 
 
+@app.route("/api/goals/forecast")
+@conditional_on_data
+def goal_forecast():
+    """Monte Carlo completion odds and dates per goal (``?paths=&horizon=`` months)."""
+    try:
+        return jsonify(
+            forecast_goals(
+                paths=_to_int(request.args.get("paths"), DEFAULT_PATHS),
+                horizon_months=_to_int(request.args.get("horizon"), DEFAULT_HORIZON_MONTHS),
+            )
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
 @app.route("/api/goals/<int:goal_id>", methods=["DELETE"])
 def remove_goal(goal_id: int):
     delete_goal(goal_id)
@@ -255,15 +720,53 @@ def add_expense():
         return jsonify({"error": str(error)}), 400
 
 
+@app.route("/api/expenses")
+def get_expenses():
+    """Filtered expense history; page with the returned ``next_cursor``."""
+    args = request.args
+    try:
+        return jsonify(
+            query_expenses(
+                start_date=args.get("start") or None,
+                end_date=args.get("end") or None,
+                category_id=_to_int(args.get("category_id")),
+                min_amount=_to_float(args.get("min_amount")),
+                max_amount=_to_float(args.get("max_amount")),
+                state=args.get("state") or None,
+                tag=args.get("tag") or None,
+                cursor=args.get("cursor") or None,
+                limit=_to_int(args.get("limit")),
+            )
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
+@app.route("/api/expenses/search")
+def search_expense_notes():
+    """Ranked full-text search of expense notes and tags (``?q=``)."""
+    args = request.args
+    try:
+        return jsonify(
+            search_expenses(
+                args.get("q", ""),
+                cursor=args.get("cursor") or None,
+                limit=_to_int(args.get("limit")),
+            )
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
 @app.route("/api/expenses/recent")
 def recent_expenses():
-    limit = int(request.args.get("limit", 50))
+    limit = clamp_limit(_to_int(request.args.get("limit"), 50))
     return jsonify(list_recent_expenses(limit=limit))
 
 
 @app.route("/api/expenses/pending")
 def pending_expenses():
-    limit = int(request.args.get("limit", 50))
+    limit = clamp_limit(_to_int(request.args.get("limit"), 50))
     return jsonify(get_pending_expenses(limit=limit))
 
 
@@ -299,17 +802,51 @@ def allocate_account():
         return jsonify({"error": str(error)}), 400
 
 
+@app.route("/api/import", methods=["POST"])
+def import_file():
+    """Bulk-import an uploaded CSV/OFX/QFX bank export (multipart field ``file``)."""
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"error": "Upload a file in the 'file' field."}), 400
+    try:
+        fmt = request.form.get("format") or detect_format(upload.filename)
+        result = import_transactions(
+            DecodedStream(upload.stream),
+            fmt,
+            default_category_id=_to_int(request.form.get("category_id")),
+            kind=request.form.get("kind") or None,
+        )
+        return jsonify(result), 201
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
 # --- Setup wizard (atomic) ---------------------------------------------------
 
-SETUP_CONFIG_TABLES = ("accounts", "debts", "categories", "recurring_expenses", "goals", "income_profile")
+# Balance history and allocations go with the accounts and debts they belong
+# to (the new ones reuse ids 1..n), and are cleared before them.
+SETUP_CONFIG_TABLES = (
+    "account_allocations",
+    "balance_updates",
+    "balance_snapshots",
+    "accounts",
+    "debts",
+    "categories",
+    "recurring_expenses",
+    "goals",
+    "income_profile",
+)
 
 
 @app.route("/api/setup", methods=["POST"])
 def complete_setup():
     """Persist the whole onboarding payload in one shot.
 
-    Goals reference accounts/debts by their position in this payload
-    (``link_index``) because the rows don't have database ids until inserted.
+    Everything runs in a single transaction with one executemany per entity
+    list, so a bad row leaves the previous configuration untouched. Goals
+    reference accounts/debts by their position in this payload
+    (``link_index``); the freshly emptied tables are filled with ids 1..n, so
+    a position maps straight to an id.
     """
     data = request.json or {}
     try:
@@ -319,88 +856,104 @@ def complete_setup():
             return jsonify({"error": f"Category percentages must total 100% (got {total:.1f}%)."}), 400
 
         today = date.today().isoformat()
-
-        for table in SETUP_CONFIG_TABLES:
-            execute(f"DELETE FROM {table}")
-
-        account_ids: list[int] = []
-        for acc in data.get("accounts", []):
-            account_ids.append(
-                execute(
-                    "INSERT INTO accounts(name, institution, type, balance, interest_rate, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-                    (
-                        acc.get("name"),
-                        acc.get("institution") or None,
-                        acc.get("type"),
-                        _to_float(acc.get("balance"), 0.0),
-                        _to_float(acc.get("interest_rate")),
-                        today,
-                    ),
-                )
-            )
-
-        debt_ids: list[int] = []
-        for debt in data.get("debts", []):
-            debt_ids.append(
-                execute(
-                    """
-                    INSERT INTO debts(name, institution, type, balance, interest_rate, min_payment, due_day, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        debt.get("name"),
-                        debt.get("institution") or None,
-                        debt.get("type"),
-                        _to_float(debt.get("balance"), 0.0),
-                        _to_float(debt.get("interest_rate")),
-                        _to_float(debt.get("min_payment")),
-                        _to_int(debt.get("due_day")),
-                        today,
-                    ),
-                )
+        accounts = data.get("accounts", [])
+        debts = data.get("debts", [])
+
+        account_rows = [
+            (
+                account_id,
+                acc.get("name"),
+                acc.get("institution") or None,
+                acc.get("type"),
+                _to_cents(acc.get("balance"), 0),
+                _to_float(acc.get("interest_rate")),
+                today,
             )
-
-        for name, pct in categories:
-            execute(
-                "INSERT INTO categories(name, parent_id, allocation_pct, created_at) VALUES (?, NULL, ?, ?)",
-                (name, float(pct), today),
+            for account_id, acc in enumerate(accounts, start=1)
+        ]
+        debt_rows = [
+            (
+                debt_id,
+                debt.get("name"),
+                debt.get("institution") or None,
+                debt.get("type"),
+                _to_cents(debt.get("balance"), 0),
+                _to_float(debt.get("interest_rate")),
+                _to_cents(debt.get("min_payment")),
+                _to_int(debt.get("due_day")),
+                today,
             )
+            for debt_id, debt in enumerate(debts, start=1)
+        ]
+        category_rows = [(name, float(pct), today) for name, pct in categories]
 
+        goals = []
         for goal in data.get("goals", []):
+            goal_type = goal.get("type", "target_balance")
             link_type = goal.get("link_type") or None
             link_id = None
+            start_amount_cents = None
             link_index = goal.get("link_index")
-            if link_type == "account" and link_index is not None and 0 <= int(link_index) < len(account_ids):
-                link_id = account_ids[int(link_index)]
-            elif link_type == "debt" and link_index is not None and 0 <= int(link_index) < len(debt_ids):
-                link_id = debt_ids[int(link_index)]
-            add_goal(
-                goal_type=goal.get("type", "target_balance"),
-                name=goal.get("name", ""),
-                link_type=link_type,
-                link_id=link_id,
-                target_amount=_to_float(goal.get("target_amount"), 0.0),
-                target_date=goal.get("target_date") or None,
-                year=_to_int(goal.get("year")),
-                contribution_limit=_to_float(goal.get("contribution_limit")),
-                contributed_so_far=_to_float(goal.get("contributed_so_far")),
+            if link_type == "account" and link_index is not None and 0 <= int(link_index) < len(account_rows):
+                link_id = account_rows[int(link_index)][0]
+            elif link_type == "debt" and link_index is not None and 0 <= int(link_index) < len(debt_rows):
+                link_id = debt_rows[int(link_index)][0]
+                if goal_type == "debt_payoff":
+                    start_amount_cents = debt_rows[int(link_index)][4]
+            goals.append(
+                {
+                    "goal_type": goal_type,
+                    "name": goal.get("name", ""),
+                    "link_type": link_type,
+                    "link_id": link_id,
+                    "start_amount_cents": start_amount_cents,
+                    "target_amount": _to_float(goal.get("target_amount"), 0.0),
+                    "target_date": goal.get("target_date") or None,
+                    "year": _to_int(goal.get("year")),
+                    "contribution_limit": _to_float(goal.get("contribution_limit")),
+                    "contributed_so_far": _to_float(goal.get("contributed_so_far")),
+                }
             )
 
-        for sub in data.get("subscriptions", []):
-            add_recurring(
-                name=sub.get("name", ""),
-                amount=_to_float(sub.get("amount"), 0.0),
-                cadence=sub.get("cadence", "monthly"),
-                category_id=None,
-                due_day=_to_int(sub.get("due_day")),
+        subscriptions = [
+            {
+                "name": sub.get("name", ""),
+                "amount": _to_float(sub.get("amount"), 0.0),
+                "cadence": sub.get("cadence", "monthly"),
+                "category_id": None,
+                "due_day": _to_int(sub.get("due_day")),
+            }
+            for sub in data.get("subscriptions", [])
+        ]
+
+        with transaction():
+            for table in SETUP_CONFIG_TABLES:
+                execute(f"DELETE FROM {table}")
+
+            executemany(
+                "INSERT INTO accounts(id, name, institution, type, balance, interest_rate, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                account_rows,
             )
-
-        income = data.get("income")
-        if income and income.get("expected_amount") not in (None, ""):
-            set_income_profile(
-                expected_amount=_to_float(income.get("expected_amount")),
-                cadence=income.get("cadence", "biweekly"),
+            executemany(
+                """
+                INSERT INTO debts(id, name, institution, type, balance, interest_rate, min_payment, due_day, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                debt_rows,
+            )
+            executemany(
+                "INSERT INTO categories(name, parent_id, allocation_pct, created_at) VALUES (?, NULL, ?, ?)",
+                category_rows,
             )
+            add_goals(goals)
+            add_recurring_many(subscriptions)
+
+            income = data.get("income")
+            if income and income.get("expected_amount") not in (None, ""):
+                set_income_profile(
+                    expected_amount=_to_float(income.get("expected_amount")),
+                    cadence=income.get("cadence", "biweekly"),
+                )
 
         return jsonify({"success": True}), 201
     except ValueError as error:
@@ -0,0 +1,10 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Any WSGI server works. Importing web_app initializes the database.
+"""
+
+from web_app import app
+
+__all__ = ["app"]